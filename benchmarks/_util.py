@@ -0,0 +1,104 @@
+# benchmarks/_util.py
+"""Shared helpers for the benchmark scripts: synthetic models, timing and peak memory sampling."""
+import os
+import platform
+import statistics
+import sys
+import threading
+import time
+
+import torch
+
+# Make the package importable when the scripts are run from a source checkout
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def synthetic_state_dict(num_params, width=1024):
+    '''Builds a state dict of roughly num_params float32 parameters split into layers of the given width.'''
+    torch.manual_seed(0)
+    state_dict = {}
+    remaining = int(num_params)
+    layer = 0
+    while remaining > 0:
+        rows = max(1, min(width, remaining // width))
+        state_dict[f'layer{layer}.weight'] = torch.randn(rows, width) * 0.02
+        remaining -= rows * width
+        layer += 1
+    return state_dict
+
+
+class SyntheticModel(torch.nn.Module):
+    """A model with roughly num_params float32 parameters and no forward pass."""
+    def __init__(self, num_params, width=1024):
+        super().__init__()
+        self.layers = torch.nn.ParameterList(
+            torch.nn.Parameter(tensor) for tensor in synthetic_state_dict(num_params, width).values())
+
+    def touch_last_layer(self):
+        '''Simulates a training step that only updates the last layer, as in fine-tuning.'''
+        with torch.no_grad():
+            self.layers[-1].add_(1e-3)
+
+
+def state_dict_bytes(state_dict):
+    return sum(t.numel() * t.element_size() for t in state_dict.values() if isinstance(t, torch.Tensor))
+
+
+def median_time(func, repeats):
+    '''Calls func repeats times and returns the median wall time in seconds.'''
+    times = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        times.append(time.perf_counter() - start)
+    return statistics.median(times)
+
+
+def _rss_bytes():
+    with open('/proc/self/statm') as f:
+        return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+
+
+class PeakMemory:
+    """Context manager sampling the resident set size on a thread and reporting the peak increase.
+
+    Only available on Linux; peak_bytes is None elsewhere.
+    """
+    def __init__(self, interval=0.0005):
+        self.interval = interval
+        self.peak_bytes = None
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        if not os.path.exists('/proc/self/statm'):
+            return self
+        self._baseline = self._peak = _rss_bytes()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def _sample(self):
+        while not self._stop.is_set():
+            self._peak = max(self._peak, _rss_bytes())
+            time.sleep(self.interval)
+
+    def __exit__(self, *exc):
+        if hasattr(self, '_thread'):
+            self._stop.set()
+            self._thread.join()
+            self._peak = max(self._peak, _rss_bytes())
+            self.peak_bytes = self._peak - self._baseline
+        return False
+
+
+def environment():
+    '''Describes the machine and versions so results can be compared between releases.'''
+    import early_stopping_pytorch
+    return {
+        'package_version': early_stopping_pytorch.__version__,
+        'torch': torch.__version__,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'processor': platform.processor() or platform.machine(),
+        'torch_threads': torch.get_num_threads(),
+    }
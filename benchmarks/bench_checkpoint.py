@@ -0,0 +1,66 @@
+# benchmarks/bench_checkpoint.py
+"""Latency, throughput and peak memory of saving a checkpoint through EarlyStopping, per save mode."""
+import os
+import tempfile
+import time
+
+import torch
+
+from _util import PeakMemory, SyntheticModel, state_dict_bytes
+from early_stopping_pytorch import (EarlyStopping, CompressedEncoder, HalfPrecisionEncoder,
+                                    IncrementalCheckpointWriter)
+
+
+def modes(directory):
+    '''Save modes to compare against the default synchronous torch.save; each maps to EarlyStopping kwargs.'''
+    path = os.path.join(directory, 'checkpoint.pt')
+    return {
+        'sync': lambda: {'path': path},
+        'async': lambda: {'path': path, 'async_save': True},
+        'in_memory': lambda: {'path': path, 'in_memory': True},
+        'fp16': lambda: {'path': path, 'encoder': HalfPrecisionEncoder(torch.float16)},
+        'zlib': lambda: {'path': path, 'encoder': CompressedEncoder('zlib', level=1)},
+        'incremental': lambda: {'incremental': IncrementalCheckpointWriter(os.path.join(directory, 'incremental'))},
+    }
+
+
+def bench_mode(name, make_kwargs, model, saves):
+    early_stopping = EarlyStopping(patience=saves + 1, trace_func=lambda msg: None, **make_kwargs())
+    call_times, total_times, peaks = [], [], []
+    for step in range(saves):
+        model.touch_last_layer()
+        with PeakMemory() as peak:
+            start = time.perf_counter()
+            # Every call improves, so every call saves
+            early_stopping(1.0 - step * 1e-3, model)
+            call_times.append(time.perf_counter() - start)
+            early_stopping.flush()
+            total_times.append(time.perf_counter() - start)
+        peaks.append(peak.peak_bytes)
+    early_stopping.close()
+    # The first save of an incremental writer is the full base; later ones are the steady state
+    steady = slice(1, None) if saves > 1 else slice(None)
+    call_s = sorted(call_times[steady])[len(call_times[steady]) // 2]
+    total_s = sorted(total_times[steady])[len(total_times[steady]) // 2]
+    return {
+        'mode': name,
+        'blocking_s': call_s,
+        'until_written_s': total_s,
+        'peak_rss_bytes': None if peaks[0] is None else max(peaks),
+    }
+
+
+def run(param_counts, saves=5, selected=None):
+    results = []
+    for num_params in param_counts:
+        model = SyntheticModel(num_params)
+        raw_bytes = state_dict_bytes(model.state_dict())
+        with tempfile.TemporaryDirectory() as directory:
+            for name, make_kwargs in modes(directory).items():
+                if selected and name not in selected:
+                    continue
+                result = bench_mode(name, make_kwargs, model, saves)
+                result.update(params=int(num_params), raw_bytes=raw_bytes,
+                              mb_per_s=raw_bytes / result['until_written_s'] / 1e6)
+                results.append(result)
+    return results
@@ -0,0 +1,86 @@
+# benchmarks/bench_encoders.py
+"""
+Compares checkpoint size and save/load latency of the checkpoint encoders on synthetic models.
+
+Usage:
+    python benchmarks/bench_encoders.py --params 1e6 1e7 --output encoders.json
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+
+import torch
+
+from _util import environment, state_dict_bytes, synthetic_state_dict
+from early_stopping_pytorch import CheckpointEncoder, HalfPrecisionEncoder, CompressedEncoder
+
+ENCODERS = {
+    'torch.save': CheckpointEncoder,
+    'fp16': lambda: HalfPrecisionEncoder(torch.float16),
+    'bf16': lambda: HalfPrecisionEncoder(torch.bfloat16),
+    'zlib': lambda: CompressedEncoder('zlib', level=1),
+    'lzma': lambda: CompressedEncoder('lzma', level=0),
+    'fp16+zlib': lambda: HalfPrecisionEncoder(torch.float16, inner=CompressedEncoder('zlib', level=1)),
+}
+
+
+def bench_encoder(name, state_dict, directory, repeats):
+    encoder = ENCODERS[name]()
+    path = os.path.join(directory, f'{name}.pt')
+    save_times, load_times = [], []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        encoder.save(state_dict, path)
+        save_times.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        encoder.load(path)
+        load_times.append(time.perf_counter() - start)
+    return {
+        'encoder': name,
+        'bytes': os.path.getsize(path),
+        'save_s': min(save_times),
+        'load_s': min(load_times),
+    }
+
+
+def run(param_counts, encoders=tuple(ENCODERS), repeats=3):
+    results = []
+    for num_params in param_counts:
+        state_dict = synthetic_state_dict(num_params)
+        raw_bytes = state_dict_bytes(state_dict)
+        with tempfile.TemporaryDirectory() as directory:
+            for name in encoders:
+                result = bench_encoder(name, state_dict, directory, repeats)
+                result.update(params=int(num_params), raw_bytes=raw_bytes,
+                              ratio=result['bytes'] / raw_bytes,
+                              save_mb_per_s=raw_bytes / result['save_s'] / 1e6)
+                results.append(result)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--params', type=float, nargs='+', default=[1e5, 1e6, 1e7],
+                        help='Synthetic model sizes in number of parameters')
+    parser.add_argument('--encoders', nargs='+', default=list(ENCODERS), choices=list(ENCODERS))
+    parser.add_argument('--repeats', type=int, default=3)
+    parser.add_argument('--output', help='Write the results as JSON to this file instead of stdout')
+    args = parser.parse_args()
+
+    results = run(args.params, args.encoders, args.repeats)
+    for r in results:
+        print(f"{r['params']:>10d} params  {r['encoder']:<10s} {r['ratio']:6.2f}x size  "
+              f"save {r['save_s'] * 1e3:8.1f} ms  load {r['load_s'] * 1e3:8.1f} ms", file=sys.stderr)
+    output = json.dumps({'environment': environment(), 'encoders': results}, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,44 @@
+# benchmarks/bench_overhead.py
+"""Per-call cost of EarlyStopping.__call__ on the no-improvement path, where no checkpoint is written."""
+import os
+import tempfile
+import time
+
+import numpy as np
+import torch
+
+from _util import SyntheticModel
+from early_stopping_pytorch import EarlyStopping
+
+
+def _no_op(msg):
+    pass
+
+
+def variants():
+    '''Loss types and options to compare; each entry is (name, EarlyStopping kwargs, loss factory).'''
+    return [
+        ('float', {'trace_func': _no_op}, lambda: 1.0),
+        ('float_no_trace', {'trace_func': None}, lambda: 1.0),
+        ('numpy_float', {'trace_func': _no_op}, lambda: np.float32(1.0)),
+        ('tensor_sync_every_call', {'trace_func': _no_op}, lambda: torch.tensor(1.0)),
+        ('tensor_deferred', {'trace_func': _no_op, 'sync_every': None}, lambda: torch.tensor(1.0)),
+    ]
+
+
+def run(calls=20000, num_params=1024):
+    results = []
+    model = SyntheticModel(num_params)
+    with tempfile.TemporaryDirectory() as directory:
+        for name, kwargs, make_loss in variants():
+            early_stopping = EarlyStopping(patience=calls * 10, path=os.path.join(directory, f'{name}.pt'), **kwargs)
+            # Establish a best loss so every timed call takes the no-improvement path
+            early_stopping(make_loss() - 1, model)
+            losses = [make_loss() for _ in range(calls)]
+            start = time.perf_counter()
+            for loss in losses:
+                early_stopping(loss, model)
+            elapsed = time.perf_counter() - start
+            early_stopping.early_stop  # settle deferred state outside the timed loop
+            results.append({'variant': name, 'calls': calls, 'us_per_call': elapsed / calls * 1e6})
+    return results
@@ -0,0 +1,42 @@
+# benchmarks/bench_scaling.py
+"""Cost per epoch of tracking many models: N EarlyStopping instances against one EarlyStoppingBank.
+
+Only the stopping decision is measured: the instances get no model and the bank saves nothing, so neither side
+copies or writes weights.
+"""
+import numpy as np
+
+from _util import median_time
+from early_stopping_pytorch import EarlyStopping, EarlyStoppingBank
+
+
+def _no_op(msg):
+    pass
+
+
+def run(member_counts, epochs=50):
+    results = []
+    rng = np.random.default_rng(0)
+    for members in member_counts:
+        # Losses drift upwards so most calls take the no-improvement path, as late in training
+        losses = 1.0 + np.cumsum(rng.uniform(-0.01, 0.02, size=(epochs, members)), axis=0)
+
+        def instances():
+            stoppers = [EarlyStopping(patience=epochs, trace_func=_no_op) for _ in range(members)]
+            for row in losses:
+                for stopper, loss in zip(stoppers, row.tolist()):
+                    stopper(loss, None)
+
+        def bank():
+            stoppers = EarlyStoppingBank(members, patience=epochs, trace_func=_no_op)
+            for row in losses:
+                stoppers(row)
+
+        instances_s = median_time(instances, repeats=3) / epochs
+        bank_s = median_time(bank, repeats=3) / epochs
+        results.append({
+            'members': members,
+            'instances_us_per_epoch': instances_s * 1e6,
+            'bank_us_per_epoch': bank_s * 1e6,
+        })
+    return results
@@ -0,0 +1,57 @@
+# benchmarks/run_benchmarks.py
+"""
+Runs the EarlyStopping benchmark suite on CPU and writes the results as JSON.
+
+Usage:
+    python benchmarks/run_benchmarks.py --output results.json
+    python benchmarks/run_benchmarks.py --quick --only overhead checkpoint
+"""
+import argparse
+import json
+import sys
+
+import torch
+
+from _util import environment
+import bench_checkpoint
+import bench_encoders
+import bench_overhead
+import bench_scaling
+
+SUITES = ('overhead', 'checkpoint', 'scaling', 'encoders')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--only', nargs='+', choices=SUITES, default=list(SUITES))
+    parser.add_argument('--quick', action='store_true', help='Small sizes, for smoke-testing the suite')
+    parser.add_argument('--params', type=float, nargs='+', help='Synthetic model sizes in number of parameters')
+    parser.add_argument('--threads', type=int, default=1,
+                        help='torch intra-op threads; fixed by default so results are comparable')
+    parser.add_argument('--output', help='Write the results as JSON to this file instead of stdout')
+    args = parser.parse_args()
+
+    torch.set_num_threads(args.threads)
+    param_counts = args.params or ([1e5, 1e6] if args.quick else [1e5, 1e6, 1e7, 5e7])
+    results = {'environment': environment()}
+    if 'overhead' in args.only:
+        results['overhead'] = bench_overhead.run(calls=2000 if args.quick else 20000)
+    if 'checkpoint' in args.only:
+        results['checkpoint'] = bench_checkpoint.run(param_counts, saves=3 if args.quick else 5)
+    if 'scaling' in args.only:
+        results['scaling'] = bench_scaling.run([1, 10, 100] if args.quick else [1, 10, 100, 1000],
+                                               epochs=10 if args.quick else 50)
+    if 'encoders' in args.only:
+        results['encoders'] = bench_encoders.run(param_counts, repeats=1 if args.quick else 3)
+
+    output = json.dumps(results, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(output)
+        print(f"Wrote {args.output}", file=sys.stderr)
+    else:
+        print(output)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,3 +1,14 @@
 from .early_stopping import EarlyStopping
+from .async_checkpoint import AsyncCheckpointWriter
+from .bank import EarlyStoppingBank
+from .multi_metric import MultiMetricEarlyStopping
+from .retention import CheckpointRetention
+from .checkpoint import load_checkpoint
+from .incremental import IncrementalCheckpointWriter, load_incremental
+from .encoders import CheckpointEncoder, HalfPrecisionEncoder, CompressedEncoder, PickleEncoder, NumpyEncoder
+from .events import Event, EventLog
+from .sequential import SequentialValidation
+from .criteria import (EMASmoothing, MedianSmoothing, StoppingCriterion, SlopeCriterion,
+                       RelativeImprovementCriterion, LearningCurveCriterion)
 
 __version__ = "1.0.10"
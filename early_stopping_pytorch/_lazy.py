@@ -0,0 +1,40 @@
+# _lazy.py
+import importlib
+import sys
+
+
+class LazyModule:
+    """Stands in for a module that is only imported on first attribute access.
+
+    Keeps torch and NumPy out of processes that only replay loss histories. Setting or deleting an
+    attribute is forwarded to the real module, so ``mock.patch('<module>.torch.save')`` keeps working.
+    """
+    def __init__(self, name):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+
+    def _load(self):
+        module = self._module
+        if module is None:
+            module = importlib.import_module(self._name)
+            object.__setattr__(self, '_module', module)
+        return module
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __delattr__(self, attr):
+        delattr(self._load(), attr)
+
+    def __repr__(self):
+        state = 'loaded' if self._module is not None else 'not loaded'
+        return f'<lazy module {self._name!r} ({state})>'
+
+
+def is_tensor(value):
+    '''isinstance(value, torch.Tensor) without importing torch: if torch is not loaded, nothing is a tensor.'''
+    torch = sys.modules.get('torch')
+    return torch is not None and isinstance(value, torch.Tensor)
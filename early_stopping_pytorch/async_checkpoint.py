@@ -0,0 +1,144 @@
+# async_checkpoint.py
+import atexit
+import collections
+import threading
+import time
+
+from ._lazy import LazyModule, is_tensor
+
+torch = LazyModule('torch')
+
+
+def snapshot_state_dict(state_dict):
+    """
+    Takes a consistent CPU copy of a state dict so it can be serialized while training continues.
+
+    Args:
+        state_dict (dict): State dict returned by ``model.state_dict()``, or a checkpoint dict nesting
+                            several state dicts (optimizer, scheduler, ...).
+
+    Returns:
+        OrderedDict: A state dict whose tensors are detached CPU copies that share no storage with the model.
+    """
+    snapshot = collections.OrderedDict()
+    for key, value in state_dict.items():
+        snapshot[key] = _snapshot_value(value)
+    metadata = getattr(state_dict, '_metadata', None)
+    if metadata is not None:
+        snapshot._metadata = metadata
+    return snapshot
+
+
+def _snapshot_value(value):
+    if is_tensor(value):
+        return value.detach().to('cpu', copy=True)
+    if isinstance(value, dict):
+        return snapshot_state_dict(value)
+    if type(value) in (list, tuple):
+        return type(value)(_snapshot_value(item) for item in value)
+    return value
+
+
+class AsyncCheckpointWriter:
+    """Serializes checkpoints on a background thread so the training loop does not wait for disk I/O."""
+    def __init__(self, max_pending=1, policy='coalesce', save_func=None, on_written=None):
+        """
+        Args:
+            max_pending (int): Maximum number of snapshots waiting to be written.
+                            Default: 1
+            policy (str): What to do when the queue is full. 'coalesce' drops the oldest pending snapshot
+                            for the same path, since a newer best supersedes it; 'block' waits for room.
+                            Default: 'coalesce'
+            save_func (function): Function called as ``save_func(state_dict, path)`` on the writer thread.
+                            Default: torch.save
+            on_written (function, optional): Called on the writer thread as ``on_written(path, duration, context)``
+                            after each successful write, with the context given to submit().
+                            Default: None
+        """
+        if max_pending < 1:
+            raise ValueError(f"max_pending must be at least 1, got {max_pending}")
+        if policy not in ('coalesce', 'block'):
+            raise ValueError(f"policy must be 'coalesce' or 'block', got {policy!r}")
+        self.max_pending = max_pending
+        self.policy = policy
+        self.save_func = save_func if save_func is not None else torch.save
+        self.on_written = on_written
+        self.dropped = 0
+        self._pending = collections.deque()
+        self._cond = threading.Condition()
+        self._busy = False
+        self._closed = False
+        self._error = None
+        self._thread = threading.Thread(target=self._run, name='EarlyStoppingCheckpointWriter', daemon=True)
+        self._thread.start()
+        atexit.register(self.close)
+
+    def submit(self, state_dict, path, context=None):
+        '''Queues a snapshot for writing and returns immediately unless the 'block' policy has to wait.'''
+        self.check()
+        with self._cond:
+            if self._closed:
+                raise RuntimeError("Cannot submit a checkpoint to a closed AsyncCheckpointWriter")
+            while len(self._pending) >= self.max_pending:
+                if self.policy == 'coalesce' and self._drop_stale(path):
+                    break
+                self._cond.wait()
+            self._pending.append((state_dict, path, context))
+            self._cond.notify_all()
+
+    def check(self):
+        '''Re-raises the error of a failed background write, if any.'''
+        with self._cond:
+            error, self._error = self._error, None
+        if error is not None:
+            raise error
+
+    def flush(self):
+        '''Blocks until every queued snapshot has been written.'''
+        with self._cond:
+            while self._pending or self._busy:
+                self._cond.wait()
+        self.check()
+
+    def close(self):
+        '''Writes the remaining snapshots and stops the writer thread.'''
+        with self._cond:
+            already_closed = self._closed
+            self._closed = True
+            self._cond.notify_all()
+        if not already_closed:
+            atexit.unregister(self.close)
+        self._thread.join()
+        self.check()
+
+    def _drop_stale(self, path):
+        for index, (_, pending_path, _) in enumerate(self._pending):
+            if pending_path == path:
+                del self._pending[index]
+                self.dropped += 1
+                return True
+        return False
+
+    def _run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._closed:
+                    self._cond.wait()
+                if not self._pending:
+                    return
+                state_dict, path, context = self._pending.popleft()
+                self._busy = True
+                self._cond.notify_all()
+            try:
+                start = time.perf_counter()
+                self.save_func(state_dict, path)
+                if self.on_written is not None:
+                    self.on_written(path, time.perf_counter() - start, context)
+            except Exception as exc:
+                with self._cond:
+                    if self._error is None:
+                        self._error = exc
+            finally:
+                with self._cond:
+                    self._busy = False
+                    self._cond.notify_all()
@@ -0,0 +1,98 @@
+# bank.py
+from ._lazy import LazyModule, is_tensor
+
+np = LazyModule('numpy')
+torch = LazyModule('torch')
+
+
+class EarlyStoppingBank:
+    """Early stopping for many models at once (sweeps, ensembles), with the per-member state kept in arrays."""
+    def __init__(self, num_members, patience=7, verbose=False, delta=0, path='checkpoint_{member}.pt',
+                 trace_func=print, encoder=None):
+        """
+        Args:
+            num_members (int): Number of models tracked by the bank.
+            patience (int or array-like): How long to wait after last time validation loss improved,
+                            either shared or one value per member.
+                            Default: 7
+            verbose (bool): If True, prints a message for each call in which members improved.
+                            Default: False
+            delta (float or array-like): Minimum change in the monitored quantity to qualify as an improvement,
+                            either shared or one value per member.
+                            Default: 0
+            path (str): Checkpoint path template, formatted with the member index.
+                            Default: 'checkpoint_{member}.pt'
+            trace_func (function): trace print function. None disables text output, and the messages are
+                            then never formatted.
+                            Default: print
+            encoder (CheckpointEncoder, optional): How the members' checkpoints are encoded, e.g.
+                            PickleEncoder() or NumpyEncoder() for models that are not built on torch, which is
+                            then never imported.
+                            Default: None (plain torch.save)
+        """
+        self.num_members = num_members
+        self.patience = np.broadcast_to(np.asarray(patience, dtype=np.int64), (num_members,)).copy()
+        self.delta = np.broadcast_to(np.asarray(delta, dtype=np.float64), (num_members,)).copy()
+        self.verbose = verbose
+        self.path = path
+        self.trace_func = trace_func
+        self.encoder = encoder
+        self.counter = np.zeros(num_members, dtype=np.int64)
+        # NaN marks members that have not recorded a best loss yet (None in EarlyStopping)
+        self.best_val_loss = np.full(num_members, np.nan)
+        self.early_stop = np.zeros(num_members, dtype=bool)
+        self.val_loss_min = np.full(num_members, np.inf)
+
+    def __call__(self, val_losses, models=None):
+        """
+        Updates every member with its validation loss.
+
+        Args:
+            val_losses (array-like or torch.Tensor): One validation loss per member. NaN entries are ignored,
+                            like NaN losses in EarlyStopping.
+            models (sequence of torch.nn.Module or dict, optional): Models, or state dicts, indexed by member.
+                            If given, the members that improved are checkpointed.
+
+        Returns:
+            tuple: (improved, early_stop) boolean masks over the members.
+        """
+        if is_tensor(val_losses):
+            # One transfer for the whole bank
+            val_losses = val_losses.detach().cpu().numpy()
+        losses = np.asarray(val_losses, dtype=np.float64)
+        if losses.shape != (self.num_members,):
+            raise ValueError(f"Expected {self.num_members} losses, got shape {losses.shape}")
+
+        valid = ~np.isnan(losses)
+        first = valid & np.isnan(self.best_val_loss)
+        with np.errstate(invalid='ignore'):
+            improved = first | (valid & (losses < self.best_val_loss - self.delta))
+        not_improved = valid & ~improved
+
+        self.best_val_loss[improved] = losses[improved]
+        self.counter[improved] = 0
+        self.counter[not_improved] += 1
+        self.early_stop |= not_improved & (self.counter >= self.patience)
+
+        if self.trace_func is not None:
+            if not valid.all():
+                self.trace_func(f"Validation loss is NaN for members {np.flatnonzero(~valid).tolist()}. "
+                                "Ignoring them this epoch.")
+            if not_improved.any():
+                self.trace_func(f'EarlyStoppingBank: {int(not_improved.sum())} members without improvement, '
+                                f'{int(self.early_stop.sum())} out of {self.num_members} stopped')
+        if models is not None and improved.any():
+            self.save_checkpoints(losses, models, improved)
+        return improved, self.early_stop.copy()
+
+    def save_checkpoints(self, val_losses, models, mask):
+        '''Saves the models of the members selected by mask.'''
+        members = np.flatnonzero(mask)
+        if self.verbose and self.trace_func is not None:
+            self.trace_func(f'Validation loss decreased for members {members.tolist()}.  Saving models ...')
+        save_func = self.encoder.save if self.encoder is not None else torch.save
+        for member in members:
+            model = models[member]
+            state_dict = model if isinstance(model, dict) else model.state_dict()
+            save_func(state_dict, self.path.format(member=member))
+        self.val_loss_min[mask] = val_losses[mask]
@@ -0,0 +1,61 @@
+# best_weights.py
+import collections
+
+from ._lazy import LazyModule
+
+torch = LazyModule('torch')
+
+
+class BestWeightsBuffer:
+    """Keeps a copy of the best state dict in reusable host memory instead of on disk."""
+    def __init__(self, pin_memory=False):
+        """
+        Args:
+            pin_memory (bool): If True and CUDA is available, the buffers are allocated in pinned memory so
+                            device-to-host copies can run asynchronously.
+                            Default: False
+        """
+        self.pin_memory = pin_memory and torch.cuda.is_available()
+        self._buffers = collections.OrderedDict()
+        self._metadata = None
+        self._pending_copy = None
+
+    def __len__(self):
+        return len(self._buffers)
+
+    @property
+    def nbytes(self):
+        '''Total size of the tensors held in the buffers.'''
+        return sum(b.numel() * b.element_size() for b in self._buffers.values() if isinstance(b, torch.Tensor))
+
+    def update(self, state_dict):
+        '''Copies the tensors of ``state_dict`` into the preallocated buffers, allocating them on first use.'''
+        non_blocking = False
+        for key, value in state_dict.items():
+            if not isinstance(value, torch.Tensor):
+                self._buffers[key] = value
+                continue
+            buffer = self._buffers.get(key)
+            if not isinstance(buffer, torch.Tensor) or buffer.shape != value.shape or buffer.dtype != value.dtype:
+                buffer = torch.empty(value.shape, dtype=value.dtype, device='cpu', pin_memory=self.pin_memory)
+                self._buffers[key] = buffer
+            copy_async = self.pin_memory and value.is_cuda
+            buffer.copy_(value.detach(), non_blocking=copy_async)
+            non_blocking = non_blocking or copy_async
+        # Drop entries that no longer exist in the model
+        for key in [key for key in self._buffers if key not in state_dict]:
+            del self._buffers[key]
+        self._metadata = getattr(state_dict, '_metadata', None)
+        if non_blocking:
+            self._pending_copy = torch.cuda.Event()
+            self._pending_copy.record()
+
+    def state_dict(self):
+        '''Returns the best state dict, waiting for any asynchronous copy to finish first.'''
+        if self._pending_copy is not None:
+            self._pending_copy.synchronize()
+            self._pending_copy = None
+        state_dict = collections.OrderedDict(self._buffers)
+        if self._metadata is not None:
+            state_dict._metadata = self._metadata
+        return state_dict
@@ -0,0 +1,129 @@
+# checkpoint.py
+import random
+
+from ._lazy import LazyModule
+
+np = LazyModule('numpy')
+torch = LazyModule('torch')
+
+# Marks a checkpoint that holds more than the model's state dict
+TRAINING_STATE_KEY = 'early_stopping_training_state'
+TRAINING_STATE_VERSION = 1
+
+
+def capture_rng_state():
+    '''Returns the Python, NumPy, torch and CUDA random number generator states, using only tensors and builtins.'''
+    bit_generator, keys, pos, has_gauss, cached_gaussian = np.random.get_state()
+    state = {
+        'python': random.getstate(),
+        'numpy': (bit_generator, torch.from_numpy(keys.copy()), pos, has_gauss, cached_gaussian),
+        'torch': torch.get_rng_state(),
+    }
+    if torch.cuda.is_available():
+        state['cuda'] = torch.cuda.get_rng_state_all()
+    return state
+
+
+def restore_rng_state(state):
+    '''Restores the random number generator states returned by capture_rng_state().'''
+    random.setstate(state['python'])
+    bit_generator, keys, pos, has_gauss, cached_gaussian = state['numpy']
+    np.random.set_state((bit_generator, keys.numpy(), pos, has_gauss, cached_gaussian))
+    torch.set_rng_state(state['torch'])
+    if 'cuda' in state and torch.cuda.is_available():
+        torch.cuda.set_rng_state_all(state['cuda'])
+
+
+def build_training_state(model_state, optimizer=None, scheduler=None, scaler=None, rng_state=False):
+    """
+    Bundles the model's state dict with the rest of the training state into one checkpoint.
+
+    Args:
+        model_state (dict): The model's state dict.
+        optimizer (torch.optim.Optimizer, optional): Optimizer whose state is captured.
+        scheduler (optional): Learning rate scheduler whose state is captured.
+        scaler (torch.amp.GradScaler, optional): Gradient scaler whose state is captured.
+        rng_state (bool): If True, the random number generator states are captured as well.
+
+    Returns:
+        dict: A checkpoint that load_checkpoint() understands.
+    """
+    checkpoint = {TRAINING_STATE_KEY: TRAINING_STATE_VERSION, 'model': model_state}
+    if optimizer is not None:
+        checkpoint['optimizer'] = optimizer.state_dict()
+    if scheduler is not None:
+        checkpoint['scheduler'] = scheduler.state_dict()
+    if scaler is not None:
+        checkpoint['scaler'] = scaler.state_dict()
+    if rng_state:
+        checkpoint['rng'] = capture_rng_state()
+    return checkpoint
+
+
+def is_training_state(checkpoint):
+    '''Returns True if the checkpoint was built by build_training_state() rather than being a plain state dict.'''
+    return isinstance(checkpoint, dict) and TRAINING_STATE_KEY in checkpoint
+
+
+def model_state(checkpoint):
+    '''Returns the model's state dict from either checkpoint layout.'''
+    return checkpoint['model'] if is_training_state(checkpoint) else checkpoint
+
+
+def _torch_load(source, map_location, mmap):
+    if not mmap:
+        return torch.load(source, map_location=map_location)
+    try:
+        return torch.load(source, map_location=map_location, mmap=True)
+    except TypeError:
+        # torch < 2.1 has no mmap argument
+        return torch.load(source, map_location=map_location)
+
+
+def load_checkpoint(path, model=None, optimizer=None, scheduler=None, scaler=None, restore_rng=False,
+                    mmap=True, map_location='cpu', assign=False):
+    """
+    Loads a checkpoint, memory-mapping it so tensors are paged in from the file instead of read into RAM up front.
+
+    With mmap, restoring a model needs roughly one copy of the weights in memory rather than two, and
+    reading a single tensor only touches that tensor's pages.
+
+    Args:
+        path (str): Checkpoint written by EarlyStopping.
+        model (torch.nn.Module, optional): Model to load the weights into.
+        optimizer (torch.optim.Optimizer, optional): Optimizer to restore, if the checkpoint holds its state.
+        scheduler (optional): Learning rate scheduler to restore, if the checkpoint holds its state.
+        scaler (torch.amp.GradScaler, optional): Gradient scaler to restore, if the checkpoint holds its state.
+        restore_rng (bool): If True, restore the random number generator states saved in the checkpoint.
+        mmap (bool): Memory-map the file. Falls back to a regular load on torch versions without support.
+        map_location: Passed to torch.load.
+        assign (bool): Passed to model.load_state_dict(); with mmap the parameters then stay backed by the file.
+                            Needs torch >= 2.1.
+
+    Returns:
+        dict: The loaded checkpoint.
+    """
+    checkpoint = _torch_load(path, map_location, mmap)
+    apply_checkpoint(checkpoint, model, optimizer, scheduler, scaler, restore_rng, assign)
+    return checkpoint
+
+
+def apply_checkpoint(checkpoint, model=None, optimizer=None, scheduler=None, scaler=None, restore_rng=False,
+                     assign=False):
+    '''Loads an already deserialized checkpoint into the given objects; see load_checkpoint() for the arguments.'''
+    if model is not None:
+        if assign:
+            model.load_state_dict(model_state(checkpoint), assign=True)
+        else:
+            # torch < 2.1 has no assign argument
+            model.load_state_dict(model_state(checkpoint))
+    if is_training_state(checkpoint):
+        for name, target in (('optimizer', optimizer), ('scheduler', scheduler), ('scaler', scaler)):
+            if target is not None:
+                if name not in checkpoint:
+                    raise KeyError(f"Checkpoint holds no {name} state")
+                target.load_state_dict(checkpoint[name])
+        if restore_rng:
+            if 'rng' not in checkpoint:
+                raise KeyError("Checkpoint holds no RNG state")
+            restore_rng_state(checkpoint['rng'])
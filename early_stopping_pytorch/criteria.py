@@ -0,0 +1,255 @@
+# criteria.py
+import bisect
+import math
+
+
+class RingBuffer:
+    """Fixed-size buffer of the most recent values; appending evicts the oldest in O(1)."""
+    def __init__(self, size):
+        if size < 1:
+            raise ValueError(f"size must be at least 1, got {size}")
+        self.size = size
+        self._values = []
+        self._start = 0
+
+    def __len__(self):
+        return len(self._values)
+
+    @property
+    def full(self):
+        return len(self._values) == self.size
+
+    def append(self, value):
+        '''Adds value and returns the evicted oldest value, or None while the buffer is filling.'''
+        if not self.full:
+            self._values.append(value)
+            return None
+        evicted = self._values[self._start]
+        self._values[self._start] = value
+        self._start = (self._start + 1) % self.size
+        return evicted
+
+    def values(self):
+        '''Returns the values from oldest to newest.'''
+        return self._values[self._start:] + self._values[:self._start]
+
+    def first(self):
+        return self._values[self._start]
+
+    def last(self):
+        return self._values[self._start - 1]
+
+
+class _SlidingFit:
+    # Least-squares line through the last `size` (x, y) points, kept up to date with running sums
+    def __init__(self, size):
+        self.points = RingBuffer(size)
+        self._sums = [0.0, 0.0, 0.0, 0.0]  # x, y, x*x, x*y
+
+    def add(self, x, y):
+        evicted = self.points.append((x, y))
+        self._accumulate(x, y, 1)
+        if evicted is not None:
+            self._accumulate(*evicted, -1)
+
+    def _accumulate(self, x, y, sign):
+        self._sums[0] += sign * x
+        self._sums[1] += sign * y
+        self._sums[2] += sign * x * x
+        self._sums[3] += sign * x * y
+
+    def fit(self):
+        '''Returns (intercept, slope), or None with fewer than two distinct x.'''
+        n = len(self.points)
+        sx, sy, sxx, sxy = self._sums
+        denominator = n * sxx - sx * sx
+        if n < 2 or denominator <= 1e-12 * n * sxx:
+            return None
+        slope = (n * sxy - sx * sy) / denominator
+        return (sy - slope * sx) / n, slope
+
+    def state_dict(self):
+        return {'points': [list(point) for point in self.points.values()]}
+
+    def load_state_dict(self, state_dict):
+        self.__init__(self.points.size)
+        for x, y in state_dict['points']:
+            self.add(x, y)
+
+
+class EMASmoothing:
+    """Exponential moving average of the validation loss."""
+    def __init__(self, alpha=0.3):
+        """
+        Args:
+            alpha (float): Weight of the newest loss, between 0 and 1. Smaller values smooth more.
+                            Default: 0.3
+        """
+        if not 0 < alpha <= 1:
+            raise ValueError(f"alpha must be in (0, 1], got {alpha}")
+        self.alpha = alpha
+        self.value = None
+
+    def update(self, loss):
+        '''Adds a loss and returns the smoothed loss.'''
+        self.value = loss if self.value is None else self.alpha * loss + (1 - self.alpha) * self.value
+        return self.value
+
+    def state_dict(self):
+        return {'value': self.value}
+
+    def load_state_dict(self, state_dict):
+        self.value = state_dict['value']
+
+
+class MedianSmoothing:
+    """Median of the last few validation losses, which ignores isolated spikes.
+
+    The window is also kept sorted, so an update is a binary search plus one list insert and removal
+    (a memmove of at most window entries) and reading the median is O(1).
+    """
+    def __init__(self, window=5):
+        """
+        Args:
+            window (int): Number of recent losses the median is taken over.
+                            Default: 5
+        """
+        self.window = RingBuffer(window)
+        self._sorted = []
+
+    def update(self, loss):
+        evicted = self.window.append(loss)
+        if evicted is not None:
+            del self._sorted[bisect.bisect_left(self._sorted, evicted)]
+        bisect.insort(self._sorted, loss)
+        middle = len(self._sorted) // 2
+        if len(self._sorted) % 2:
+            return self._sorted[middle]
+        return (self._sorted[middle - 1] + self._sorted[middle]) / 2
+
+    def state_dict(self):
+        return {'values': self.window.values()}
+
+    def load_state_dict(self, state_dict):
+        self.window = RingBuffer(self.window.size)
+        self._sorted = []
+        for value in state_dict['values']:
+            self.update(value)
+
+
+class StoppingCriterion:
+    """Base class of the trend criteria. update() sees every (smoothed) loss and returns True to stop."""
+
+    def update(self, epoch, loss):
+        raise NotImplementedError
+
+    def state_dict(self):
+        return {}
+
+    def load_state_dict(self, state_dict):
+        pass
+
+
+class SlopeCriterion(StoppingCriterion):
+    """Stops when the loss, fitted by a line over the last window epochs, no longer decreases fast enough."""
+    def __init__(self, window=10, min_decrease=0.0):
+        """
+        Args:
+            window (int): Number of recent epochs the line is fitted to. No decision is made before the
+                            window is full.
+                            Default: 10
+            min_decrease (float): Minimum decrease of the loss per epoch along the fitted line.
+                            Default: 0.0
+        """
+        self.min_decrease = min_decrease
+        self._fit = _SlidingFit(window)
+
+    @property
+    def slope(self):
+        fit = self._fit.fit()
+        return None if fit is None else fit[1]
+
+    def update(self, epoch, loss):
+        self._fit.add(epoch, loss)
+        slope = self.slope
+        return self._fit.points.full and slope is not None and -slope <= self.min_decrease
+
+    def state_dict(self):
+        return self._fit.state_dict()
+
+    def load_state_dict(self, state_dict):
+        self._fit.load_state_dict(state_dict)
+
+
+class RelativeImprovementCriterion(StoppingCriterion):
+    """Stops when the loss improved by less than a fraction of its value over the last window epochs."""
+    def __init__(self, window=10, min_improvement=1e-3):
+        """
+        Args:
+            window (int): Number of epochs the improvement is measured over.
+                            Default: 10
+            min_improvement (float): Minimum relative decrease, (old - new) / |old|.
+                            Default: 1e-3
+        """
+        self.min_improvement = min_improvement
+        self.losses = RingBuffer(window + 1)
+
+    def update(self, epoch, loss):
+        self.losses.append(loss)
+        if not self.losses.full:
+            return False
+        old, new = self.losses.first(), self.losses.last()
+        return (old - new) / max(abs(old), 1e-12) < self.min_improvement
+
+    def state_dict(self):
+        return {'losses': self.losses.values()}
+
+    def load_state_dict(self, state_dict):
+        self.losses = RingBuffer(self.losses.size)
+        for value in state_dict['losses']:
+            self.losses.append(value)
+
+
+class LearningCurveCriterion(StoppingCriterion):
+    """Extrapolates the learning curve and stops when a delta improvement is out of reach within the budget.
+
+    The last window losses are fitted with ``loss = a + b * epoch ** -exponent``, a power law that is
+    linear in its parameters, and the fit is evaluated at max_epochs.
+    """
+    def __init__(self, max_epochs, delta=0.0, window=10, min_points=5, exponent=1.0):
+        """
+        Args:
+            max_epochs (int): Epoch at which training ends anyway.
+            delta (float): Improvement over the best loss seen so far that must still be reachable.
+                            Default: 0.0
+            window (int): Number of recent epochs the curve is fitted to.
+                            Default: 10
+            min_points (int): Number of epochs seen before any decision is made.
+                            Default: 5
+            exponent (float): Decay exponent of the power law.
+                            Default: 1.0
+        """
+        self.max_epochs = max_epochs
+        self.delta = delta
+        self.min_points = max(2, min_points)
+        self.exponent = exponent
+        self.best = math.inf
+        self.predicted = None
+        self._fit = _SlidingFit(window)
+
+    def update(self, epoch, loss):
+        self.best = min(self.best, loss)
+        self._fit.add(epoch ** -self.exponent, loss)
+        fit = self._fit.fit()
+        if fit is None or len(self._fit.points) < self.min_points or epoch >= self.max_epochs:
+            return False
+        intercept, slope = fit
+        self.predicted = intercept + slope * self.max_epochs ** -self.exponent
+        return self.predicted >= self.best - self.delta
+
+    def state_dict(self):
+        return dict(self._fit.state_dict(), best=self.best)
+
+    def load_state_dict(self, state_dict):
+        self._fit.load_state_dict(state_dict)
+        self.best = state_dict['best']
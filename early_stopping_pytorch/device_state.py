@@ -0,0 +1,78 @@
+# device_state.py
+import collections
+import math
+
+from ._lazy import LazyModule
+
+torch = LazyModule('torch')
+
+
+def _host_sync(tensor):
+    '''Copies a tensor to the host as Python numbers. Every device synchronization of EarlyStopping goes through here.'''
+    return tensor.tolist()
+
+
+class DeviceStateTracker:
+    """Tracks the early stopping state on the loss tensor's device so no host synchronization is needed per call."""
+    def __init__(self, loss, best_val_loss, counter, early_stop):
+        """
+        Args:
+            loss (torch.Tensor): First validation loss, used to pick the device.
+            best_val_loss (float or None): Best loss recorded so far on the host.
+            counter (int): Patience counter recorded so far on the host.
+            early_stop (bool): Early stop flag recorded so far on the host.
+        """
+        device = loss.device
+        self.best = torch.tensor(math.inf if best_val_loss is None else best_val_loss,
+                                 dtype=loss.dtype, device=device)
+        self.has_best = torch.tensor(best_val_loss is not None, device=device)
+        self.counter = torch.tensor(counter, dtype=torch.int64, device=device)
+        self.stop = torch.tensor(early_stop, device=device)
+        self.improved = torch.tensor(False, device=device)
+        # Device copy of the best weights; stays None while no state dict is passed
+        self.weights = None
+        self.pending_calls = 0
+
+    def update(self, loss, state_dict, patience, delta):
+        '''Applies one validation loss and keeps a device copy of the weights of the best epoch.
+
+        The copy costs one extra model's worth of device memory. It is updated in place, so a call adds no
+        allocation, but it does read and write every weight. Pass state_dict=None to only track the loss.
+        '''
+        loss = loss.detach().reshape(()).to(self.best.dtype)
+        is_nan = torch.isnan(loss)
+        improved = ~is_nan & (~self.has_best | (loss < self.best - delta))
+        self.best = torch.where(improved, loss, self.best)
+        self.has_best = self.has_best | improved
+        self.counter = torch.where(is_nan, self.counter,
+                                   torch.where(improved, torch.zeros_like(self.counter), self.counter + 1))
+        self.stop = self.stop | (self.counter >= patience)
+        self.improved = self.improved | improved
+        if state_dict is not None:
+            self._track_weights(state_dict, improved)
+        self.pending_calls += 1
+
+    def _track_weights(self, state_dict, improved):
+        if self.weights is None:
+            self.weights = collections.OrderedDict()
+        for key, value in state_dict.items():
+            weight = self.weights.get(key)
+            if not isinstance(value, torch.Tensor):
+                self.weights[key] = value
+            elif not isinstance(weight, torch.Tensor) or weight.shape != value.shape or weight.dtype != value.dtype:
+                self.weights[key] = value.detach().clone()
+            else:
+                torch.where(improved, value.detach(), weight, out=weight)
+
+    def sync(self):
+        '''Copies the state to the host in a single transfer.
+
+        Returns:
+            tuple: (best_val_loss, counter, early_stop, improved since the previous sync)
+        '''
+        values = torch.stack([self.best.to(torch.float64), self.counter.to(torch.float64),
+                              self.stop.to(torch.float64), self.improved.to(torch.float64)])
+        best, counter, stop, improved = _host_sync(values)
+        self.improved = torch.zeros_like(self.improved)
+        self.pending_calls = 0
+        return best, int(counter), bool(stop), bool(improved)
@@ -0,0 +1,64 @@
+# distributed.py
+import os
+
+from ._lazy import LazyModule, is_tensor
+
+torch = LazyModule('torch')
+dist = LazyModule('torch.distributed')
+
+
+def is_initialized():
+    '''Returns True if a torch.distributed process group is available and initialized.'''
+    return dist.is_available() and dist.is_initialized()
+
+
+def get_rank():
+    '''Returns the rank of this process, or 0 outside of a process group.'''
+    return dist.get_rank() if is_initialized() else 0
+
+
+def _collective_device():
+    # NCCL only reduces CUDA tensors; every other backend works on CPU tensors
+    if dist.get_backend() == 'nccl':
+        return torch.device('cuda', torch.cuda.current_device())
+    return torch.device('cpu')
+
+
+def all_reduce_mean(val_loss):
+    """
+    Averages a validation loss over all ranks.
+
+    Args:
+        val_loss (float or torch.Tensor): This rank's validation loss.
+
+    Returns:
+        float or torch.Tensor: The mean loss, of the same type (and device) as val_loss.
+    """
+    if is_tensor(val_loss):
+        tensor = val_loss.detach().reshape(()).to(_collective_device(), copy=True)
+    else:
+        tensor = torch.tensor(float(val_loss), dtype=torch.float64, device=_collective_device())
+    dist.all_reduce(tensor, op=dist.ReduceOp.SUM)
+    tensor /= dist.get_world_size()
+    if is_tensor(val_loss):
+        return tensor.to(val_loss.device)
+    return tensor.item()
+
+
+def broadcast_flag(flag, src=0):
+    '''Returns the value of ``flag`` on rank ``src`` on every rank.'''
+    tensor = torch.tensor(int(flag), dtype=torch.int32, device=_collective_device())
+    dist.broadcast(tensor, src=src)
+    return bool(tensor.item())
+
+
+def barrier():
+    '''Waits for every rank, if a process group is initialized.'''
+    if is_initialized():
+        dist.barrier()
+
+
+def shard_path(path, rank):
+    '''Returns the per-rank variant of a checkpoint path, e.g. checkpoint.rank1.pt.'''
+    root, ext = os.path.splitext(path)
+    return f'{root}.rank{rank}{ext}'
@@ -1,11 +1,44 @@
 # early_stopping.py
-import numpy as np
-import torch
+import json
+import math
+import os
+import time
+
+from ._lazy import LazyModule, is_tensor
+from .async_checkpoint import AsyncCheckpointWriter, snapshot_state_dict
+from .best_weights import BestWeightsBuffer
+from .device_state import DeviceStateTracker, _host_sync
+from . import distributed as dist_utils
+from .retention import atomic_save
+from .checkpoint import apply_checkpoint, build_training_state, load_checkpoint, model_state
+from .incremental import MANIFEST_NAME, load_incremental
+from .events import EventLog
+from .sequential import SequentialValidation
+
+# Only imported once a checkpoint is written with the default torch.save
+torch = LazyModule('torch')
+
+STATE_VERSION = 1
+
+
+def _file_size(path):
+    return os.path.getsize(path) if path is not None and os.path.exists(path) else None
+
+
+def _describe_checkpoint(path, epoch, val_loss):
+    size = os.path.getsize(path) if os.path.isfile(path) else None
+    return {'path': path, 'epoch': epoch, 'val_loss': val_loss, 'bytes': size}
 
 
 class EarlyStopping:
     """Early stops the training if validation loss doesn't improve after a given patience."""
-    def __init__(self, patience=7, verbose=False, delta=0, path='checkpoint.pt', trace_func=print):
+    def __init__(self, patience=7, verbose=False, delta=0, path='checkpoint.pt', trace_func=print,
+                 async_save=False, max_pending_saves=1, pending_policy='coalesce',
+                 in_memory=False, pin_memory=False, save_on_stop=False, sync_every=1,
+                 distributed=False, save_rank=0, shard_checkpoints=False, retention=None,
+                 resume=False, optimizer=None, scheduler=None, scaler=None, save_rng_state=False,
+                 incremental=None, encoder=None, callbacks=None, event_buffer_size=0, smoothing=None,
+                 criteria=()):
         """
         Args:
             patience (int): How long to wait after last time validation loss improved.
@@ -16,43 +49,540 @@ class EarlyStopping:
                             Default: 0
             path (str): Path for the checkpoint to be saved to.
                             Default: 'checkpoint.pt'
-            trace_func (function): trace print function.
+            trace_func (function): trace print function. None disables text output, and the messages are
+                            then never formatted.
                             Default: print
+            async_save (bool): If True, checkpoints are snapshotted to CPU and written on a background thread.
+                            Call flush() or close() to wait for the last write.
+                            Default: False
+            max_pending_saves (int): Maximum number of snapshots queued for the background writer.
+                            Default: 1
+            pending_policy (str): 'coalesce' replaces a stale queued snapshot with the newer best,
+                            'block' waits for the writer to catch up.
+                            Default: 'coalesce'
+            in_memory (bool): If True, the best weights are kept in reusable host buffers instead of being
+                            written to path. Use restore_best() to load them back into the model.
+                            Default: False
+            pin_memory (bool): Allocate the in-memory buffers in pinned memory when CUDA is available.
+                            Default: False
+            save_on_stop (bool): With in_memory, write the best weights to path once, when early stopping
+                            triggers or close() is called.
+                            Default: False
+            sync_every (int or None): For torch.Tensor losses, how many calls may pass between host
+                            synchronizations. In between, the comparison and counter stay on the loss's device
+                            and the best weights are kept in a device copy. None syncs only when early_stop is
+                            read. counter and best_val_loss are updated at each sync. The device copy doubles
+                            the model's weight memory on its device and every call reads and writes all weights,
+                            so this pays off for small or mid-sized models; it is skipped when no checkpoint is
+                            written (model=None or a rank other than save_rank).
+                            Default: 1
+            distributed (bool): If True and torch.distributed is initialized, the validation loss is averaged
+                            over all ranks and early_stop is broadcast from save_rank, so all ranks stop together.
+                            Every rank must call EarlyStopping at the same points.
+                            Default: False
+            save_rank (int): In distributed mode, the only rank that writes the checkpoint.
+                            Default: 0
+            shard_checkpoints (bool): In distributed mode, let every rank write its own checkpoint to
+                            a per-rank path (checkpoint.rank<N>.pt) instead.
+                            Default: False
+            retention (CheckpointRetention, optional): Keep the k best checkpoints in a directory instead of
+                            overwriting path. Epochs that are not a new best but still enter the top k are saved
+                            too; all others are never serialized. With in_memory, only the best weights are
+                            written, once, by save_on_stop. Cannot be combined with async_save.
+                            Default: None
+            resume (bool): If True, the state (counter, best loss, ...) is kept in a small JSON file next to
+                            the checkpoint (path + '.state.json') after every call, and is loaded on construction
+                            when it exists and its checkpoint is present. A restarted job then continues where it
+                            left off without re-saving the model. Checkpoints are then written to a temporary
+                            file and renamed into place, and the state records the last checkpoint that finished
+                            writing, with its size, so a restart never trusts a partial file or pairs a newer
+                            best loss with older weights.
+                            Default: False
+            optimizer (torch.optim.Optimizer, optional): If given, its state is saved in the checkpoint
+                            together with the model. The checkpoint then becomes a dict with a 'model' entry;
+                            use load_checkpoint() or restore_best() to read it back.
+                            Default: None
+            scheduler (optional): Learning rate scheduler whose state is saved in the checkpoint.
+                            Default: None
+            scaler (torch.amp.GradScaler, optional): Gradient scaler whose state is saved in the checkpoint.
+                            Default: None
+            save_rng_state (bool): If True, the Python, NumPy, torch and CUDA RNG states are saved in the
+                            checkpoint. The extra state is not kept in in_memory mode, and with sync_every != 1
+                            it is captured at the sync rather than at the best epoch.
+                            Default: False
+            incremental (IncrementalCheckpointWriter, optional): Write a base snapshot plus deltas that only
+                            hold the tensors changed since the previous save, into the writer's directory instead
+                            of path. The files are written with the writer's save_func, never with encoder.
+                            Cannot be combined with retention, async_save, encoder or in_memory.
+                            Default: None
+            encoder (CheckpointEncoder, optional): How checkpoints written to path are encoded, e.g.
+                            HalfPrecisionEncoder() or CompressedEncoder('lzma'). restore_best() decodes them.
+                            PickleEncoder() and NumpyEncoder() save models that are not built on torch, which
+                            is then never imported. A retention without its own save_func writes through the
+                            encoder as well.
+                            Default: None (plain torch.save)
+            callbacks (iterable of function, optional): Called with an Event for improved, no_improvement,
+                            nan_skipped, checkpoint_started, checkpoint_finished (with duration and bytes),
+                            stopped and validation_stopped_early. Events of background writes are delivered
+                            from the writer thread.
+                            Default: None
+            event_buffer_size (int): Keep the most recent events in the ring buffer ``events.buffer``.
+                            Default: 0
+            smoothing (optional): EMASmoothing or MedianSmoothing applied to the validation loss before it
+                            is compared; best_val_loss then holds the smoothed value.
+                            Default: None
+            criteria (iterable of StoppingCriterion): Trend tests, e.g. SlopeCriterion or
+                            LearningCurveCriterion, fed the (smoothed) loss every epoch. Training stops as soon
+                            as one of them triggers, even if patience has not run out. Smoothing and criteria
+                            need host losses, so they cannot be combined with sync_every != 1.
+                            Default: ()
         """
         self.patience = patience
         self.verbose = verbose
         self.counter = 0
         self.best_val_loss = None
         self.early_stop = False
-        self.val_loss_min = np.inf
+        self.val_loss_min = math.inf
         self.delta = delta
         self.path = path
         self.trace_func = trace_func
+        self.encoder = encoder
+        self.events = EventLog(callbacks, event_buffer_size)
+        self._writer = AsyncCheckpointWriter(max_pending_saves, pending_policy, self._write,
+                                             self._on_background_write) if async_save else None
+        # The last best checkpoint known to be completely on disk; this is what the resume state refers to
+        self._written = None
+        self._best_weights = BestWeightsBuffer(pin_memory) if in_memory else None
+        self.save_on_stop = save_on_stop
+        self._unsaved_best = False
+        self._best_epoch = None
+        self.sync_every = sync_every
+        self._device_state = None
+        self.distributed = distributed
+        self.save_rank = save_rank
+        self.shard_checkpoints = shard_checkpoints
+        self.retention = retention
+        self.epoch = 0
+        self.optimizer = optimizer
+        self.scheduler = scheduler
+        self.scaler = scaler
+        self.save_rng_state = save_rng_state
+        if incremental is not None and retention is not None:
+            raise ValueError("incremental and retention cannot be combined")
+        if incremental is not None and async_save:
+            raise ValueError("async_save and incremental cannot be combined")
+        if incremental is not None and encoder is not None:
+            # The base and delta files are read back with torch.load by load_incremental()
+            raise ValueError("encoder and incremental cannot be combined")
+        if incremental is not None and in_memory:
+            # in_memory keeps the best weights off disk, and save_on_stop would write a file over the directory
+            raise ValueError("in_memory and incremental cannot be combined")
+        if encoder is not None and retention is not None:
+            # Retention files are decoded with encoder.load, so they have to be written with encoder.save
+            if retention.save_func is not None:
+                raise ValueError("encoder cannot be combined with a retention that has its own save_func")
+            retention.save_func = encoder.save
+        if async_save and retention is not None:
+            # Retention updates its index and evicts files as it saves; that stays on the calling thread
+            raise ValueError("async_save and retention cannot be combined")
+        self.incremental = incremental
+        if (smoothing is not None or criteria) and sync_every != 1:
+            raise ValueError("smoothing and criteria cannot be combined with sync_every != 1")
+        self.smoothing = smoothing
+        self.criteria = list(criteria)
+        self.resume = resume
+        if resume:
+            self._resume()
+
+    @property
+    def early_stop(self):
+        # Reading the flag is the point where deferred device state has to reach the host
+        self._sync_device_state()
+        return self._early_stop
+
+    @early_stop.setter
+    def early_stop(self, value):
+        self._early_stop = value
 
     def __call__(self, val_loss, model):
+        start = time.perf_counter()
+        try:
+            self._call(val_loss, model)
+        finally:
+            self.events.add_time('call', time.perf_counter() - start)
+
+    def _call(self, val_loss, model):
+        self.epoch += 1
+        # Surface errors from a background write that failed since the last call
+        if self._writer is not None:
+            self._writer.check()
+
+        if isinstance(val_loss, SequentialValidation):
+            if val_loss.stopped_early:
+                self.events.emit('validation_stopped_early', self.epoch, decision=val_loss.decision,
+                                 batches=val_loss.batches, estimate=val_loss.mean)
+            val_loss = val_loss.mean
+
+        if self.distributed and dist_utils.is_initialized():
+            val_loss = dist_utils.all_reduce_mean(val_loss)
+
+        if is_tensor(val_loss):
+            if self.sync_every != 1:
+                self._update_on_device(val_loss, model)
+                return
+            val_loss = _host_sync(val_loss.detach().reshape(()))
+        elif self._device_state is not None:
+            # Switching back to host losses: settle the deferred state first
+            self._sync_device_state()
+            self._device_state = None
+
+        self._update_on_host(val_loss, model)
+        self._agree_on_stop()
+        self._persist_state()
+
+    def _update_on_host(self, val_loss, model):
+        # NumPy scalars (e.g. np.mean over a float32 array) would otherwise end up in the JSON state
+        val_loss = float(val_loss)
         # Check if validation loss is nan
-        if np.isnan(val_loss):
-            self.trace_func("Validation loss is NaN. Ignoring this epoch.")
+        if math.isnan(val_loss):
+            if self.trace_func is not None:
+                self.trace_func("Validation loss is NaN. Ignoring this epoch.")
+            self.events.emit('nan_skipped', self.epoch)
             return
 
+        if self.smoothing is not None:
+            val_loss = self.smoothing.update(val_loss)
+        # Every criterion sees every epoch, so none of them is short-circuited
+        triggered = [criterion for criterion in self.criteria if criterion.update(self.epoch, val_loss)]
+
         if self.best_val_loss is None:
+            self.events.emit('improved', self.epoch, val_loss=val_loss, previous=None)
             self.best_val_loss = val_loss
             self.save_checkpoint(val_loss, model)
         elif val_loss < self.best_val_loss - self.delta:
             # Significant improvement detected
+            self.events.emit('improved', self.epoch, val_loss=val_loss, previous=self.best_val_loss)
             self.best_val_loss = val_loss
             self.save_checkpoint(val_loss, model)
             self.counter = 0  # Reset counter since improvement occurred
         else:
             # No significant improvement
             self.counter += 1
-            self.trace_func(f'EarlyStopping counter: {self.counter} out of {self.patience}')
-            if self.counter >= self.patience:
-                self.early_stop = True
+            if self.trace_func is not None:
+                self.trace_func(f'EarlyStopping counter: {self.counter} out of {self.patience}')
+            self.events.emit('no_improvement', self.epoch, val_loss=val_loss, counter=self.counter)
+            if (self.retention is not None and self._best_weights is None and model is not None
+                    and self._writes_checkpoint() and self.retention.accepts(val_loss)):
+                # Not a new best, but still one of the k best; in_memory mode only ever writes the best
+                checkpoint = self._build_checkpoint(model.state_dict())
+                self._record_checkpoint(val_loss, lambda: self._write_checkpoint(checkpoint, val_loss), best=False)
+            if self.counter >= self.patience and not self._early_stop:
+                self._stop()
+                return
+        if triggered and not self._early_stop:
+            if self.trace_func is not None:
+                self.trace_func(f'EarlyStopping: {type(triggered[0]).__name__} triggered')
+            self._stop(reason=type(triggered[0]).__name__)
+
+    def _agree_on_stop(self):
+        # Ranks could disagree through numerical noise; follow save_rank so nobody waits in a collective alone
+        if self.distributed and dist_utils.is_initialized():
+            if dist_utils.broadcast_flag(self._early_stop, src=self.save_rank) and not self._early_stop:
+                self._stop(reason='save_rank')
+
+    def _stop(self, reason='patience'):
+        self.early_stop = True
+        self.events.emit('stopped', self.epoch, counter=self.counter, best_val_loss=self.best_val_loss,
+                         reason=reason)
+        if self.save_on_stop:
+            self._save_best_weights()
+        # Make sure the best checkpoint is on disk before the caller breaks out and loads it
+        self.flush()
+
+    def _update_on_device(self, val_loss, model):
+        if self._device_state is None:
+            self._device_state = DeviceStateTracker(val_loss, self.best_val_loss, self.counter, self._early_stop)
+        state_dict = model.state_dict() if model is not None and self._writes_checkpoint() else None
+        self._device_state.update(val_loss, state_dict, self.patience, self.delta)
+        if self.sync_every is not None and self._device_state.pending_calls >= self.sync_every:
+            self._sync_device_state()
+
+    def _sync_device_state(self):
+        state = self._device_state
+        if state is None or not state.pending_calls:
+            return
+        best_val_loss, counter, early_stop, improved = state.sync()
+        if improved:
+            self.events.emit('improved', self.epoch, val_loss=best_val_loss, previous=self.best_val_loss)
+            self.best_val_loss = best_val_loss
+            self.save_checkpoint(best_val_loss, state.weights)
+        self.counter = counter
+        if counter:
+            if self.trace_func is not None:
+                self.trace_func(f'EarlyStopping counter: {self.counter} out of {self.patience}')
+            self.events.emit('no_improvement', self.epoch, val_loss=None, counter=counter)
+        if early_stop and not self._early_stop:
+            self._stop()
+        self._agree_on_stop()
+        self._persist_state()
 
     def save_checkpoint(self, val_loss, model):
-        '''Saves model when validation loss decreases.'''
-        if self.verbose:
+        '''Saves model when validation loss decreases.
+
+        Args:
+            val_loss (float): The new best validation loss.
+            model (torch.nn.Module or dict): The model, or a state dict to save directly. None only records
+                            the loss, for processes that replay loss histories without a model.
+        '''
+        if model is None:
+            self.val_loss_min = val_loss
+            return
+        if self.verbose and self.trace_func is not None:
             self.trace_func(f'Validation loss decreased ({self.val_loss_min:.6f} --> {val_loss:.6f}).  Saving model ...')
-        torch.save(model.state_dict(), self.path)
+        state_dict = model if isinstance(model, dict) else model.state_dict()
+        if self._best_weights is not None:
+            self._record_checkpoint(val_loss, lambda: self._copy_to_memory(state_dict))
+        elif self._writes_checkpoint():
+            checkpoint = self._build_checkpoint(state_dict)
+            self._record_checkpoint(val_loss, lambda: self._write_checkpoint(checkpoint, val_loss))
         self.val_loss_min = val_loss
+
+    def _record_checkpoint(self, val_loss, write, best=True):
+        # write() returns (path, bytes), or None when the write finishes on the background thread
+        self.events.emit('checkpoint_started', self.epoch, val_loss=val_loss)
+        start = time.perf_counter()
+        result = write()
+        if result is not None:
+            path, nbytes = result
+            if best and path is not None:
+                self._written = _describe_checkpoint(path, self.epoch, val_loss)
+            self.events.emit('checkpoint_finished', self.epoch, duration=time.perf_counter() - start,
+                             bytes=nbytes, path=path)
+
+    def _copy_to_memory(self, state_dict):
+        self._best_weights.update(state_dict)
+        self._unsaved_best = True
+        self._best_epoch = self.epoch
+        return None, self._best_weights.nbytes
+
+    def _write_checkpoint(self, checkpoint, val_loss):
+        if self.retention is not None:
+            path = self.retention.save(checkpoint, val_loss, self.epoch)
+        elif self.incremental is not None:
+            self.incremental.save(checkpoint)
+            return self.incremental.path, self.incremental.last_bytes_written
+        elif self._writer is not None:
+            self._writer.submit(snapshot_state_dict(checkpoint), self.checkpoint_path, context=(self.epoch, val_loss))
+            return None
+        else:
+            path = self.checkpoint_path
+            self._write(checkpoint, path)
+        return path, _file_size(path)
+
+    def _on_background_write(self, path, duration, context):
+        epoch, val_loss = context
+        self._written = _describe_checkpoint(path, epoch, val_loss)
+        self.events.emit('checkpoint_finished', epoch, duration=duration, bytes=_file_size(path), path=path)
+
+    def _build_checkpoint(self, state_dict):
+        if self.optimizer is None and self.scheduler is None and self.scaler is None and not self.save_rng_state:
+            return state_dict
+        return build_training_state(state_dict, self.optimizer, self.scheduler, self.scaler, self.save_rng_state)
+
+    def sequential_validation(self, confidence=0.95, min_batches=20, total_batches=None, early_exit='worse'):
+        '''
+        Starts a validation pass that can end as soon as its outcome is clear at the given confidence.
+
+        Feed it one loss per batch with ``update()`` and break when it returns True, then pass it to this
+        object in place of the validation loss. A clearly worse pass then counts towards patience like a
+        full one. The first pass has nothing to compare against and always runs to the end. See
+        SequentialValidation for the arguments. With distributed training each rank decides on its own
+        batches, so only use it when ranks can leave the validation loop independently.
+        '''
+        self._sync_device_state()
+        threshold = None if self.best_val_loss is None else self.best_val_loss - self.delta
+        return SequentialValidation(threshold, confidence, min_batches, total_batches, early_exit)
+
+    def restore_best(self, model, optimizer=None, scheduler=None, scaler=None, restore_rng=False):
+        """
+        Loads the best weights seen so far back into the model.
+
+        Checkpoints on disk are memory-mapped, so restoring does not need a second full copy of the weights.
+
+        Args:
+            model (torch.nn.Module): Model to load the best weights into.
+            optimizer (torch.optim.Optimizer, optional): Optimizer to restore from the checkpoint.
+            scheduler (optional): Learning rate scheduler to restore from the checkpoint.
+            scaler (torch.amp.GradScaler, optional): Gradient scaler to restore from the checkpoint.
+            restore_rng (bool): If True, restore the RNG states saved in the checkpoint.
+        """
+        self._sync_device_state()
+        if self._best_weights is not None:
+            if not len(self._best_weights):
+                raise RuntimeError("No best weights have been recorded yet")
+            if optimizer is not None or scheduler is not None or scaler is not None or restore_rng:
+                raise ValueError("in_memory mode only keeps the model's weights")
+            model.load_state_dict(self._best_weights.state_dict())
+            return
+        self.flush()
+        # Other ranks may read the file save_rank has just written
+        if self.distributed:
+            dist_utils.barrier()
+        apply_checkpoint(self._load_best_checkpoint(), model, optimizer, scheduler, scaler, restore_rng)
+
+    def _write(self, checkpoint, path):
+        save_func = self.encoder.save if self.encoder is not None else torch.save
+        if self.resume:
+            # A preempted write must not leave a truncated file that a restart would trust
+            atomic_save(checkpoint, path, save_func)
+        else:
+            save_func(checkpoint, path)
+
+    def _load_best_checkpoint(self):
+        if self.incremental is not None:
+            return load_incremental(self.checkpoint_path)
+        if self.encoder is not None:
+            return self.encoder.load(self.checkpoint_path)
+        return load_checkpoint(self.checkpoint_path)
+
+    def _save_best_weights(self):
+        if self._best_weights is not None and self._unsaved_best:
+            if self._writes_checkpoint():
+                def write():
+                    if self.retention is not None:
+                        # Through the index, so the file name and entry describe the epoch that is written
+                        epoch = self._best_epoch if self._best_epoch is not None else self.epoch
+                        path = self.retention.save(self._best_weights.state_dict(), self.best_val_loss, epoch)
+                    else:
+                        path = self.checkpoint_path
+                        self._write(self._best_weights.state_dict(), path)
+                    return path, _file_size(path)
+                self._record_checkpoint(self.best_val_loss, write)
+            self._unsaved_best = False
+
+    @property
+    def checkpoint_path(self):
+        '''Path of the current best checkpoint of this process.'''
+        if self.retention is not None and self.retention.best is not None:
+            return self.retention.best['path']
+        if self.incremental is not None:
+            return self.incremental.path
+        if self.distributed and self.shard_checkpoints and dist_utils.is_initialized():
+            return dist_utils.shard_path(self.path, dist_utils.get_rank())
+        return self.path
+
+    def _writes_checkpoint(self):
+        if not self.distributed or self.shard_checkpoints:
+            return True
+        return dist_utils.get_rank() == self.save_rank
+
+    def state_dict(self):
+        '''Returns the early stopping state as a JSON-serializable dict.'''
+        self._sync_device_state()
+        return {
+            'version': STATE_VERSION,
+            'path': self.path,
+            'patience': self.patience,
+            'delta': self.delta,
+            'epoch': self.epoch,
+            'counter': self.counter,
+            'best_val_loss': self.best_val_loss,
+            'val_loss_min': self.val_loss_min,
+            'early_stop': self._early_stop,
+            'smoothing': self.smoothing.state_dict() if self.smoothing is not None else None,
+            'criteria': [criterion.state_dict() for criterion in self.criteria],
+            'checkpoint': self._written,
+        }
+
+    def load_state_dict(self, state_dict):
+        '''Restores the state returned by state_dict(). patience and delta keep their constructor values.'''
+        if state_dict.get('version') != STATE_VERSION:
+            raise ValueError(f"Unsupported EarlyStopping state version: {state_dict.get('version')}")
+        self._device_state = None
+        self.epoch = state_dict['epoch']
+        self.counter = state_dict['counter']
+        self.best_val_loss = state_dict['best_val_loss']
+        self.val_loss_min = state_dict['val_loss_min']
+        self.early_stop = state_dict['early_stop']
+        if self.smoothing is not None and state_dict.get('smoothing') is not None:
+            self.smoothing.load_state_dict(state_dict['smoothing'])
+        for criterion, criterion_state in zip(self.criteria, state_dict.get('criteria', ())):
+            criterion.load_state_dict(criterion_state)
+        self._written = state_dict.get('checkpoint')
+
+    @property
+    def state_path(self):
+        '''Path of the JSON file the state is kept in when resume is enabled.'''
+        if self.distributed and self.shard_checkpoints and dist_utils.is_initialized():
+            return dist_utils.shard_path(self.path, dist_utils.get_rank()) + '.state.json'
+        return f'{self.path}.state.json'
+
+    def _persist_state(self):
+        if self.resume and self._writes_checkpoint():
+            def dump(state, path):
+                with open(path, 'w') as f:
+                    json.dump(state, f)
+            atomic_save(self.state_dict(), self.state_path, dump)
+
+    def _resume(self):
+        if not os.path.exists(self.state_path):
+            return
+        with open(self.state_path) as f:
+            state = json.load(f)
+        if state.get('version') != STATE_VERSION or state.get('path') != self.path:
+            if self.trace_func is not None:
+                self.trace_func(f"Ignoring EarlyStopping state in {self.state_path}: it does not belong to {self.path}.")
+            return
+        # The recorded best is only useful if its checkpoint survived
+        if self.retention is not None:
+            has_checkpoint = self.retention.best is not None
+        elif self.incremental is not None:
+            # The writer creates its directory up front; only the manifest shows that a base was written
+            has_checkpoint = os.path.exists(os.path.join(self.incremental.path, MANIFEST_NAME))
+        else:
+            has_checkpoint = os.path.exists(self.checkpoint_path)
+        if state['best_val_loss'] is not None and not has_checkpoint:
+            if self.trace_func is not None:
+                self.trace_func(f"Ignoring EarlyStopping state in {self.state_path}: checkpoint is missing.")
+            return
+        written = state.get('checkpoint')
+        if written is not None and written['bytes'] is not None and _file_size(written['path']) != written['bytes']:
+            if self.trace_func is not None:
+                self.trace_func(f"Ignoring EarlyStopping state in {self.state_path}: checkpoint is incomplete.")
+            return
+        self.load_state_dict(state)
+        if written is not None and written['val_loss'] != self.best_val_loss:
+            # A newer best was still being written when the job stopped; continue from the one on disk
+            self.best_val_loss = self.val_loss_min = written['val_loss']
+        if self._best_weights is not None and has_checkpoint:
+            self._best_weights.update(model_state(self._load_best_checkpoint()))
+        if self.verbose and self.trace_func is not None:
+            self.trace_func(f"Resumed EarlyStopping at epoch {self.epoch} "
+                            f"(best {self.best_val_loss}, counter {self.counter} out of {self.patience}).")
+
+    @property
+    def metrics(self):
+        '''Cumulative event counts, timers (seconds spent in calls and checkpoints) and checkpoint bytes.'''
+        return self.events.metrics()
+
+    def add_callback(self, callback):
+        '''Registers a function to be called with every Event.'''
+        self.events.add_callback(callback)
+
+    def flush(self):
+        '''Waits until pending background checkpoint writes have finished.'''
+        self._sync_device_state()
+        if self._writer is not None:
+            self._writer.flush()
+            # Only now does the state describe a checkpoint that is on disk
+            self._persist_state()
+
+    def close(self):
+        '''Waits for pending background checkpoint writes and stops the writer thread.'''
+        self._sync_device_state()
+        if self.save_on_stop:
+            self._save_best_weights()
+        if self._writer is not None:
+            self._writer.close()
+        # The last background write or save_on_stop may have finished only now
+        self._persist_state()
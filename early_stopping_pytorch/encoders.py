@@ -0,0 +1,176 @@
+# encoders.py
+import bz2
+import collections
+import fnmatch
+import lzma
+import pickle
+import tempfile
+import zlib
+
+from ._lazy import LazyModule
+from .checkpoint import _torch_load, is_training_state
+
+np = LazyModule('numpy')
+torch = LazyModule('torch')
+
+HALF_PRECISION_KEY = 'early_stopping_half_precision'
+
+_COMPRESSORS = {
+    'zlib': (lambda level: zlib.compressobj(-1 if level is None else level), zlib.decompressobj),
+    'lzma': (lambda level: lzma.LZMACompressor(preset=level), lzma.LZMADecompressor),
+    'bz2': (lambda level: bz2.BZ2Compressor(9 if level is None else level), bz2.BZ2Decompressor),
+}
+
+
+class CheckpointEncoder:
+    """Writes checkpoints with torch.save and reads them back with a memory-mapped torch.load.
+
+    This is also the saver interface: subclasses override save() and load() to plug in another format.
+    """
+
+    def save(self, checkpoint, path):
+        '''Writes the checkpoint to path.'''
+        torch.save(checkpoint, path)
+
+    def load(self, path, map_location='cpu'):
+        '''Reads a checkpoint written by save().'''
+        return _torch_load(path, map_location, mmap=True)
+
+
+class PickleEncoder(CheckpointEncoder):
+    """Writes checkpoints with pickle, for models whose state is not made of torch tensors."""
+    def __init__(self, protocol=pickle.HIGHEST_PROTOCOL):
+        """
+        Args:
+            protocol (int): Pickle protocol.
+                            Default: pickle.HIGHEST_PROTOCOL
+        """
+        self.protocol = protocol
+
+    def save(self, checkpoint, path):
+        with open(path, 'wb') as f:
+            pickle.dump(checkpoint, f, protocol=self.protocol)
+
+    def load(self, path, map_location=None):
+        with open(path, 'rb') as f:
+            return pickle.load(f)
+
+
+class NumpyEncoder(CheckpointEncoder):
+    """Writes a flat dict of arrays (e.g. NumPy or flattened JAX parameters) to an uncompressed .npz archive."""
+
+    def save(self, checkpoint, path):
+        # Through a file object, so np.savez does not append '.npz' to path
+        with open(path, 'wb') as f:
+            np.savez(f, **{key: np.asarray(value) for key, value in checkpoint.items()})
+
+    def load(self, path, map_location=None):
+        with np.load(path) as archive:
+            return {key: archive[key] for key in archive.files}
+
+
+class HalfPrecisionEncoder(CheckpointEncoder):
+    """Stores the model's floating point weights in half precision and casts them back when loading."""
+    def __init__(self, dtype=None, keep_full_precision=(), inner=None):
+        """
+        Args:
+            dtype (torch.dtype): Reduced precision type, torch.float16 or torch.bfloat16.
+                            Default: torch.float16
+            keep_full_precision (iterable of str): fnmatch patterns of state dict keys to leave untouched,
+                            e.g. ('*.running_var', 'head.*').
+                            Default: ()
+            inner (CheckpointEncoder, optional): Encoder that writes the reduced checkpoint, e.g. a
+                            CompressedEncoder.
+                            Default: CheckpointEncoder()
+        """
+        if dtype is None:
+            dtype = torch.float16
+        if dtype not in (torch.float16, torch.bfloat16):
+            raise ValueError(f"dtype must be torch.float16 or torch.bfloat16, got {dtype}")
+        self.dtype = dtype
+        self.keep_full_precision = tuple(keep_full_precision)
+        self.inner = inner if inner is not None else CheckpointEncoder()
+
+    def save(self, checkpoint, path):
+        # Only the model's weights are reduced; optimizer moments would lose too much in half precision
+        state_dict = checkpoint['model'] if is_training_state(checkpoint) else checkpoint
+        reduced = collections.OrderedDict()
+        dtypes = {}
+        for key, value in state_dict.items():
+            if (isinstance(value, torch.Tensor) and value.is_floating_point() and value.dtype != self.dtype
+                    and not any(fnmatch.fnmatchcase(key, pattern) for pattern in self.keep_full_precision)):
+                dtypes[key] = str(value.dtype).replace('torch.', '')
+                value = value.detach().to(self.dtype)
+            reduced[key] = value
+        if getattr(state_dict, '_metadata', None) is not None:
+            reduced._metadata = state_dict._metadata
+        if is_training_state(checkpoint):
+            reduced = dict(checkpoint, model=reduced)
+        self.inner.save({HALF_PRECISION_KEY: 1, 'dtypes': dtypes, 'checkpoint': reduced}, path)
+
+    def load(self, path, map_location='cpu'):
+        payload = self.inner.load(path, map_location)
+        checkpoint = payload['checkpoint']
+        state_dict = checkpoint['model'] if is_training_state(checkpoint) else checkpoint
+        for key, dtype in payload['dtypes'].items():
+            state_dict[key] = state_dict[key].to(getattr(torch, dtype))
+        return checkpoint
+
+
+class _CompressingWriter:
+    # File-like object torch.save can stream into; output is compressed chunk by chunk as it arrives
+    def __init__(self, file, compressor, chunk_size):
+        self.file = file
+        self.compressor = compressor
+        self.chunk_size = chunk_size
+
+    def write(self, data):
+        view = memoryview(data).cast('B')
+        for start in range(0, len(view), self.chunk_size):
+            self.file.write(self.compressor.compress(view[start:start + self.chunk_size]))
+        return len(view)
+
+    def flush(self):
+        pass
+
+    def close(self):
+        self.file.write(self.compressor.flush())
+
+
+class CompressedEncoder(CheckpointEncoder):
+    """Compresses checkpoints with a standard library codec while they are being written."""
+    def __init__(self, method='zlib', level=None, chunk_size=1 << 20):
+        """
+        Args:
+            method (str): 'zlib', 'lzma' or 'bz2'.
+                            Default: 'zlib'
+            level (int, optional): Compression level (preset for lzma). None uses the codec's default.
+                            Default: None
+            chunk_size (int): Number of bytes handed to the compressor at a time, which bounds the extra
+                            memory a save needs.
+                            Default: 1 MiB
+        """
+        if method not in _COMPRESSORS:
+            raise ValueError(f"method must be one of {sorted(_COMPRESSORS)}, got {method!r}")
+        self.method = method
+        self.level = level
+        self.chunk_size = chunk_size
+
+    def save(self, checkpoint, path):
+        make_compressor, _ = _COMPRESSORS[self.method]
+        with open(path, 'wb') as f:
+            writer = _CompressingWriter(f, make_compressor(self.level), self.chunk_size)
+            torch.save(checkpoint, writer)
+            writer.close()
+
+    def load(self, path, map_location='cpu'):
+        _, make_decompressor = _COMPRESSORS[self.method]
+        decompressor = make_decompressor()
+        # Decompress into a temporary file rather than memory; torch.load needs a seekable source
+        with open(path, 'rb') as f, tempfile.TemporaryFile() as tmp:
+            for chunk in iter(lambda: f.read(self.chunk_size), b''):
+                tmp.write(decompressor.decompress(chunk))
+            if hasattr(decompressor, 'flush'):
+                tmp.write(decompressor.flush())
+            tmp.seek(0)
+            return _torch_load(tmp, map_location, mmap=False)
@@ -0,0 +1,72 @@
+# events.py
+import collections
+import threading
+import time
+
+EVENT_NAMES = (
+    'improved',
+    'no_improvement',
+    'nan_skipped',
+    'checkpoint_started',
+    'checkpoint_finished',
+    'stopped',
+    'validation_stopped_early',
+)
+
+Event = collections.namedtuple('Event', ['name', 'epoch', 'time', 'data'])
+Event.__doc__ = """An EarlyStopping event. data holds the event's fields, e.g. val_loss, counter, duration or bytes."""
+
+
+class EventLog:
+    """Dispatches EarlyStopping events to callbacks, keeps the most recent ones and aggregates counters and timers."""
+    def __init__(self, callbacks=None, buffer_size=0):
+        """
+        Args:
+            callbacks (iterable of function, optional): Functions called with each Event. Events of
+                            background checkpoint writes are delivered from the writer thread.
+                            Default: None
+            buffer_size (int): Number of recent events kept in a ring buffer; 0 keeps none.
+                            Default: 0
+        """
+        self.callbacks = list(callbacks or ())
+        self.buffer = collections.deque(maxlen=buffer_size) if buffer_size else None
+        self.counts = collections.Counter()
+        self.timers = collections.defaultdict(float)
+        self.bytes_written = 0
+        self._lock = threading.Lock()
+
+    def add_callback(self, callback):
+        '''Registers a function to be called with every Event.'''
+        self.callbacks.append(callback)
+
+    def remove_callback(self, callback):
+        self.callbacks.remove(callback)
+
+    def emit(self, name, epoch, **data):
+        '''Records an event; an Event object is only built when a callback or the ring buffer wants it.'''
+        with self._lock:
+            self.counts[name] += 1
+            if name == 'checkpoint_finished':
+                self.timers['checkpoint'] += data.get('duration') or 0.0
+                self.bytes_written += data.get('bytes') or 0
+            if not self.callbacks and self.buffer is None:
+                return
+            event = Event(name, epoch, time.time(), data)
+            if self.buffer is not None:
+                self.buffer.append(event)
+            callbacks = list(self.callbacks)
+        for callback in callbacks:
+            callback(event)
+
+    def add_time(self, name, seconds):
+        '''Adds to a cumulative timer.'''
+        with self._lock:
+            self.timers[name] += seconds
+
+    def metrics(self):
+        '''Returns the cumulative counters and timers as a flat dict suitable for a metrics system.'''
+        with self._lock:
+            metrics = {f'events.{name}': self.counts.get(name, 0) for name in EVENT_NAMES}
+            metrics.update({f'time.{name}_seconds': seconds for name, seconds in self.timers.items()})
+            metrics['checkpoint.bytes_written'] = self.bytes_written
+        return metrics
@@ -0,0 +1,169 @@
+# incremental.py
+import collections
+import hashlib
+import json
+import os
+
+from ._lazy import LazyModule
+from .retention import atomic_save
+
+torch = LazyModule('torch')
+
+MANIFEST_NAME = 'manifest.json'
+MANIFEST_VERSION = 1
+
+
+def _flatten(checkpoint):
+    # Nested dicts (a training state holding the model and optimizer) are flattened to tuple keys so
+    # that every tensor can be compared on its own
+    flat = collections.OrderedDict()
+    metadata = {}
+
+    def visit(obj, prefix):
+        if getattr(obj, '_metadata', None) is not None:
+            metadata[prefix] = obj._metadata
+        for key, value in obj.items():
+            if isinstance(value, dict) and value:
+                visit(value, prefix + (key,))
+            else:
+                flat[prefix + (key,)] = value
+
+    visit(checkpoint, ())
+    return flat, metadata
+
+
+def _unflatten(flat, metadata):
+    checkpoint = collections.OrderedDict()
+    for path, value in flat.items():
+        node = checkpoint
+        for key in path[:-1]:
+            node = node.setdefault(key, collections.OrderedDict())
+        node[path[-1]] = value
+    for path, node_metadata in metadata.items():
+        node = checkpoint
+        for key in path:
+            node = node[key]
+        node._metadata = node_metadata
+    return checkpoint
+
+
+def _hash_fingerprint(tensor):
+    data = tensor.detach().contiguous().cpu().reshape(-1).view(torch.uint8).numpy()
+    return (tuple(tensor.shape), str(tensor.dtype), hashlib.blake2b(data, digest_size=16).digest())
+
+
+def _version_fingerprint(tensor):
+    # _version is bumped by every in-place update, so an untouched (e.g. frozen) tensor keeps its value
+    return (tuple(tensor.shape), str(tensor.dtype), tensor.data_ptr(), tensor._version)
+
+
+class IncrementalCheckpointWriter:
+    """Writes a base snapshot followed by deltas that only hold the tensors changed since the previous save."""
+    def __init__(self, path, change_detection='hash', compact_every=10, save_func=None):
+        """
+        Args:
+            path (str): Directory holding the manifest, the base snapshot and the deltas.
+            change_detection (str): 'hash' compares a hash of each tensor's bytes; 'version' compares
+                            the tensor's in-place version counter and storage, which avoids reading the data but
+                            treats every in-place write as a change.
+                            Default: 'hash'
+            compact_every (int): Number of deltas after which the next save writes a new base and removes
+                            the old files.
+                            Default: 10
+            save_func (function): Function called as ``save_func(obj, path)``.
+                            Default: torch.save
+        """
+        if change_detection not in ('hash', 'version'):
+            raise ValueError(f"change_detection must be 'hash' or 'version', got {change_detection!r}")
+        self.path = path
+        self.change_detection = change_detection
+        self.compact_every = compact_every
+        self.save_func = save_func
+        self.bytes_written = 0
+        self.last_bytes_written = 0
+        self._fingerprints = None
+        os.makedirs(path, exist_ok=True)
+        manifest = self._read_manifest()
+        self._base = manifest['base'] if manifest else None
+        self._deltas = manifest['deltas'] if manifest else []
+        self._next_id = manifest['next_id'] if manifest else 0
+
+    def save(self, checkpoint):
+        '''Writes the checkpoint as a delta against the previous save, or as a new base when compacting.'''
+        flat, metadata = _flatten(checkpoint)
+        fingerprint = _hash_fingerprint if self.change_detection == 'hash' else _version_fingerprint
+        fingerprints = {key: fingerprint(value) for key, value in flat.items() if isinstance(value, torch.Tensor)}
+
+        if self._fingerprints is None or len(self._deltas) >= self.compact_every:
+            self._write_base(flat, metadata)
+        else:
+            changed = collections.OrderedDict(
+                (key, value) for key, value in flat.items()
+                if not isinstance(value, torch.Tensor) or fingerprints[key] != self._fingerprints.get(key))
+            self._write_delta(changed, list(flat), metadata)
+        self._fingerprints = fingerprints
+
+    def _write_base(self, flat, metadata):
+        name = self._write({'tensors': flat, 'metadata': metadata}, 'base')
+        stale = ([self._base] if self._base else []) + self._deltas
+        self._base, self._deltas = name, []
+        self._write_manifest()
+        # Old files are only removed once the manifest no longer refers to them
+        for old in stale:
+            old_path = os.path.join(self.path, old)
+            if os.path.exists(old_path):
+                os.remove(old_path)
+
+    def _write_delta(self, changed, keys, metadata):
+        name = self._write({'changed': changed, 'keys': keys, 'metadata': metadata}, 'delta')
+        self._deltas.append(name)
+        self._write_manifest()
+
+    def _write(self, payload, kind):
+        name = f'{kind}-{self._next_id:06d}.pt'
+        self._next_id += 1
+        file_path = os.path.join(self.path, name)
+        atomic_save(payload, file_path, self.save_func)
+        self.last_bytes_written = os.path.getsize(file_path)
+        self.bytes_written += self.last_bytes_written
+        return name
+
+    def _read_manifest(self):
+        manifest_path = os.path.join(self.path, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            return None
+        with open(manifest_path) as f:
+            return json.load(f)
+
+    def _write_manifest(self):
+        manifest = {'version': MANIFEST_VERSION, 'base': self._base, 'deltas': self._deltas, 'next_id': self._next_id}
+
+        def dump(obj, path):
+            with open(path, 'w') as f:
+                json.dump(obj, f)
+        atomic_save(manifest, os.path.join(self.path, MANIFEST_NAME), dump)
+
+
+def load_incremental(path, map_location='cpu'):
+    """
+    Reconstructs the latest checkpoint from a base snapshot and its deltas.
+
+    Args:
+        path (str): Directory written by IncrementalCheckpointWriter.
+        map_location: Passed to torch.load.
+
+    Returns:
+        dict: The checkpoint as it was passed to the last save.
+    """
+    with open(os.path.join(path, MANIFEST_NAME)) as f:
+        manifest = json.load(f)
+    if manifest.get('version') != MANIFEST_VERSION:
+        raise ValueError(f"Unsupported incremental checkpoint version: {manifest.get('version')}")
+    base = torch.load(os.path.join(path, manifest['base']), map_location=map_location)
+    flat, metadata = base['tensors'], base['metadata']
+    for name in manifest['deltas']:
+        delta = torch.load(os.path.join(path, name), map_location=map_location)
+        flat.update(delta['changed'])
+        flat = collections.OrderedDict((key, flat[key]) for key in delta['keys'])
+        metadata = delta['metadata']
+    return _unflatten(flat, metadata)
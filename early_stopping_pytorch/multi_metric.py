@@ -0,0 +1,195 @@
+# multi_metric.py
+import math
+import os
+import shutil
+
+from .checkpoint import apply_checkpoint, load_checkpoint
+from .events import EventLog
+from .retention import atomic_save
+
+STOP_RULES = ('any', 'all', 'primary')
+
+
+class _MetricState:
+    # Best value and patience counter of one monitored metric
+    def __init__(self, name, mode='min', delta=0, patience=7):
+        if mode not in ('min', 'max'):
+            raise ValueError(f"mode of metric {name!r} must be 'min' or 'max', got {mode!r}")
+        self.name = name
+        self.mode = mode
+        self.delta = delta
+        self.patience = patience
+        self.best = None
+        self.counter = 0
+
+    @property
+    def exhausted(self):
+        return self.counter >= self.patience
+
+    def improves(self, value):
+        if self.best is None:
+            return True
+        if self.mode == 'min':
+            return value < self.best - self.delta
+        return value > self.best + self.delta
+
+
+class MultiMetricEarlyStopping:
+    """Early stopping on several metrics at once, serializing the model at most once per call."""
+    def __init__(self, metrics, stop_rule='any', primary=None, path='best_{metric}.pt', verbose=False,
+                 trace_func=print, save_func=None, encoder=None, callbacks=None):
+        """
+        Args:
+            metrics (dict): Maps each metric name to its options, a dict with 'mode' ('min' or 'max'),
+                            'delta' and 'patience', e.g. {'val_loss': {}, 'accuracy': {'mode': 'max'}}.
+                            Missing options default to mode 'min', delta 0 and patience 7.
+            stop_rule (str): 'any' stops when one metric ran out of patience, 'all' when every metric has,
+                            'primary' when the primary metric has.
+                            Default: 'any'
+            primary (str, optional): The metric the 'primary' rule follows.
+                            Default: the first metric
+            path (str): Checkpoint path template for each metric's best model, formatted with the metric name.
+                            Default: 'best_{metric}.pt'
+            verbose (bool): If True, prints a message for each metric that improved.
+                            Default: False
+            trace_func (function): trace print function. None disables text output.
+                            Default: print
+            save_func (function): Function called as ``save_func(state_dict, path)``. restore_best() reads
+                            the file with torch.load; use encoder for other formats.
+                            Default: torch.save
+            encoder (CheckpointEncoder, optional): How the checkpoints are encoded, e.g. PickleEncoder() for
+                            models that are not built on torch. restore_best() decodes them. Cannot be combined
+                            with save_func.
+                            Default: None
+            callbacks (iterable of function, optional): Called with an Event for improved, no_improvement,
+                            nan_skipped (each with a metric field), checkpoint_started, checkpoint_finished and
+                            stopped.
+                            Default: None
+        """
+        if not metrics:
+            raise ValueError("At least one metric is required")
+        if stop_rule not in STOP_RULES:
+            raise ValueError(f"stop_rule must be one of {STOP_RULES}, got {stop_rule!r}")
+        self.metrics = {name: _MetricState(name, **options) for name, options in metrics.items()}
+        if encoder is not None and save_func is not None:
+            raise ValueError("encoder and save_func cannot be combined")
+        self.primary = primary if primary is not None else next(iter(self.metrics))
+        if self.primary not in self.metrics:
+            raise ValueError(f"Unknown primary metric {self.primary!r}")
+        self.stop_rule = stop_rule
+        self.path = path
+        self.verbose = verbose
+        self.trace_func = trace_func
+        self.save_func = save_func
+        self.encoder = encoder
+        self.events = EventLog(callbacks)
+        self.epoch = 0
+        self.early_stop = False
+
+    def __call__(self, values, model):
+        """
+        Updates every metric with its value for this epoch.
+
+        Args:
+            values (dict): Maps metric names to their values. Metrics that are missing or NaN are skipped
+                            and keep their counter.
+            model (torch.nn.Module or dict): Model, or state dict, to checkpoint for the metrics that improved.
+
+        Returns:
+            list: Names of the metrics that improved.
+        """
+        self.epoch += 1
+        unknown = set(values) - set(self.metrics)
+        if unknown:
+            raise ValueError(f"Unknown metrics: {sorted(unknown)}")
+
+        improved = []
+        for name, metric in self.metrics.items():
+            value = values.get(name)
+            if value is None:
+                continue
+            value = float(value)
+            if math.isnan(value):
+                self.events.emit('nan_skipped', self.epoch, metric=name)
+                continue
+            if metric.improves(value):
+                self.events.emit('improved', self.epoch, metric=name, value=value, previous=metric.best)
+                if self.verbose and self.trace_func is not None:
+                    self.trace_func(f'{name} improved ({metric.best} --> {value:.6f}).')
+                metric.best = value
+                metric.counter = 0
+                improved.append(name)
+            else:
+                metric.counter += 1
+                self.events.emit('no_improvement', self.epoch, metric=name, value=value, counter=metric.counter)
+                if self.trace_func is not None:
+                    self.trace_func(f'EarlyStopping counter for {name}: {metric.counter} out of {metric.patience}')
+
+        if improved:
+            self.save_checkpoints(improved, model)
+        if not self.early_stop and self._should_stop():
+            self.early_stop = True
+            self.events.emit('stopped', self.epoch, reason=self.stop_rule,
+                             exhausted=[name for name, metric in self.metrics.items() if metric.exhausted])
+        return improved
+
+    def _should_stop(self):
+        if self.stop_rule == 'primary':
+            return self.metrics[self.primary].exhausted
+        exhausted = [metric.exhausted for metric in self.metrics.values()]
+        return any(exhausted) if self.stop_rule == 'any' else all(exhausted)
+
+    def best_path(self, metric):
+        '''Path of the best checkpoint of the given metric.'''
+        return self.path.format(metric=metric)
+
+    def save_checkpoints(self, names, model):
+        '''Serializes the model once and links (or copies) the file into the best slot of every named metric.'''
+        state_dict = model if isinstance(model, dict) else model.state_dict()
+        self.events.emit('checkpoint_started', self.epoch, metrics=list(names))
+        paths = [self.best_path(name) for name in names]
+        save_func = self.encoder.save if self.encoder is not None else self.save_func
+        atomic_save(state_dict, paths[0], save_func)
+        for path in paths[1:]:
+            _link_or_copy(paths[0], path)
+        self.events.emit('checkpoint_finished', self.epoch, bytes=os.path.getsize(paths[0]), paths=paths)
+
+    def restore_best(self, model, metric=None):
+        '''Loads the best weights of a metric (default: the primary one) into the model.'''
+        path = self.best_path(metric if metric is not None else self.primary)
+        if self.encoder is None:
+            return load_checkpoint(path, model)
+        checkpoint = self.encoder.load(path)
+        apply_checkpoint(checkpoint, model)
+        return checkpoint
+
+    def state_dict(self):
+        '''Returns the per-metric bests and counters as a JSON-serializable dict.'''
+        return {
+            'epoch': self.epoch,
+            'early_stop': self.early_stop,
+            'metrics': {name: {'best': metric.best, 'counter': metric.counter}
+                        for name, metric in self.metrics.items()},
+        }
+
+    def load_state_dict(self, state_dict):
+        '''Restores the state returned by state_dict(). Modes, deltas and patiences keep their constructor values.'''
+        self.epoch = state_dict['epoch']
+        self.early_stop = state_dict['early_stop']
+        for name, metric_state in state_dict['metrics'].items():
+            self.metrics[name].best = metric_state['best']
+            self.metrics[name].counter = metric_state['counter']
+
+
+def _link_or_copy(source, path):
+    # Link into a temporary name and rename it into place, so path is replaced atomically and an earlier
+    # link from another metric's slot keeps pointing at its own (older) file
+    tmp_path = f'{path}.tmp'
+    if os.path.lexists(tmp_path):
+        os.remove(tmp_path)
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        # File systems without hard links
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, path)
@@ -0,0 +1,121 @@
+# retention.py
+import json
+import os
+
+from ._lazy import LazyModule
+
+torch = LazyModule('torch')
+
+
+def atomic_save(obj, path, save_func=None):
+    '''Writes ``obj`` to a temporary file next to ``path`` and renames it into place, so ``path`` is never partial.'''
+    if save_func is None:
+        save_func = torch.save
+    tmp_path = f'{path}.tmp'
+    try:
+        save_func(obj, tmp_path)
+        os.replace(tmp_path, path)
+    except BaseException:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+class CheckpointRetention:
+    """Keeps the k best checkpoints of a run, optionally within a disk budget, and evicts the worst on insert."""
+    def __init__(self, directory, k=3, max_bytes=None, filename='checkpoint_epoch{epoch}_{score:.6f}.pt',
+                 index_name='index.json', save_func=None):
+        """
+        Args:
+            directory (str): Directory the checkpoints and the index file are written to.
+            k (int): Maximum number of checkpoints to keep.
+                            Default: 3
+            max_bytes (int, optional): Maximum total size of the kept checkpoints. The best checkpoint
+                            is always kept, even if it alone exceeds the budget.
+                            Default: None
+            filename (str): Checkpoint file name template, formatted with epoch and score.
+                            Default: 'checkpoint_epoch{epoch}_{score:.6f}.pt'
+            index_name (str): Name of the JSON index file listing the kept checkpoints.
+                            Default: 'index.json'
+            save_func (function): Function called as ``save_func(state_dict, path)``.
+                            Default: torch.save
+        """
+        if k < 1:
+            raise ValueError(f"k must be at least 1, got {k}")
+        self.directory = directory
+        self.k = k
+        self.max_bytes = max_bytes
+        self.filename = filename
+        self.index_path = os.path.join(directory, index_name)
+        self.save_func = save_func
+        os.makedirs(directory, exist_ok=True)
+        # Sorted from best (lowest score) to worst
+        self.entries = self._load_index()
+
+    @property
+    def total_bytes(self):
+        return sum(entry['bytes'] for entry in self.entries)
+
+    @property
+    def best(self):
+        '''The entry of the best checkpoint, or None if nothing has been saved.'''
+        return self.entries[0] if self.entries else None
+
+    def accepts(self, score):
+        '''Returns True if a checkpoint with this score would be kept, so callers can skip serializing it.'''
+        if not self.entries:
+            return True
+        better_than_worst = score < self.entries[-1]['score']
+        if len(self.entries) >= self.k:
+            return better_than_worst
+        if self.max_bytes is not None:
+            # Assume the candidate is as large as the checkpoints already kept
+            expected_bytes = self.total_bytes / len(self.entries)
+            if self.total_bytes + expected_bytes > self.max_bytes:
+                return better_than_worst
+        return True
+
+    def save(self, state_dict, score, epoch):
+        """
+        Writes a checkpoint if it enters the top k and evicts the checkpoints that drop out.
+
+        Args:
+            state_dict (dict): State dict to save.
+            score (float): Score of the checkpoint; lower is better.
+            epoch (int): Epoch the checkpoint was taken at.
+
+        Returns:
+            str or None: Path of the written checkpoint, or None if it was not good enough to keep.
+        """
+        score = float(score)
+        if not self.accepts(score):
+            return None
+        path = os.path.join(self.directory, self.filename.format(epoch=epoch, score=score))
+        atomic_save(state_dict, path, self.save_func)
+        entry = {'path': path, 'score': score, 'epoch': epoch, 'bytes': os.path.getsize(path)}
+        self.entries = [e for e in self.entries if e['path'] != path]
+        self.entries.append(entry)
+        self.entries.sort(key=lambda e: e['score'])
+        self._evict()
+        self._write_index()
+        return path if any(e['path'] == path for e in self.entries) else None
+
+    def _evict(self):
+        while len(self.entries) > self.k or (
+                self.max_bytes is not None and len(self.entries) > 1 and self.total_bytes > self.max_bytes):
+            worst = self.entries.pop()
+            if os.path.exists(worst['path']):
+                os.remove(worst['path'])
+
+    def _load_index(self):
+        if not os.path.exists(self.index_path):
+            return []
+        with open(self.index_path) as f:
+            entries = json.load(f)['checkpoints']
+        return sorted((e for e in entries if os.path.exists(e['path'])), key=lambda e: e['score'])
+
+    def _write_index(self):
+        def dump(index, path):
+            with open(path, 'w') as f:
+                json.dump(index, f, indent=2)
+        atomic_save({'checkpoints': self.entries}, self.index_path, dump)
@@ -0,0 +1,86 @@
+# sequential.py
+import math
+import statistics
+
+
+class SequentialValidation:
+    """Accumulates per-batch validation losses and tells when the epoch's outcome is already clear.
+
+    Keeps a running mean and variance (Welford) of the batch losses and compares a one-sided confidence
+    bound on the mean loss against the improvement threshold ``best_val_loss - delta``. The bound assumes
+    the batches are an exchangeable sample of the validation set, e.g. a shuffled validation loader.
+    """
+    def __init__(self, threshold, confidence=0.95, min_batches=20, total_batches=None, early_exit='worse'):
+        """
+        Args:
+            threshold (float, optional): Loss the epoch must get below to count as an improvement. None
+                            (no best loss yet) never decides early.
+            confidence (float): Confidence required before deciding, between 0.5 and 1.
+                            Default: 0.95
+            min_batches (int): Number of batches seen before any decision is made.
+                            Default: 20
+            total_batches (int, optional): Number of batches in the full pass. Enables the finite
+                            population correction, which tightens the bound as the pass nears its end.
+                            Default: None
+            early_exit (str): 'worse' only ends clearly worse passes early; 'both' also ends clearly
+                            better ones, in which case the estimated mean becomes the new best loss.
+                            Default: 'worse'
+        """
+        if not 0.5 < confidence < 1:
+            raise ValueError(f"confidence must be between 0.5 and 1, got {confidence}")
+        if early_exit not in ('worse', 'both'):
+            raise ValueError(f"early_exit must be 'worse' or 'both', got {early_exit!r}")
+        self.threshold = threshold
+        self.confidence = confidence
+        self.min_batches = max(2, min_batches)
+        self.total_batches = total_batches
+        self.early_exit = early_exit
+        self.decision = None
+        self.batches = 0
+        self._z = statistics.NormalDist().inv_cdf(confidence)
+        self._mean = 0.0
+        self._m2 = 0.0
+
+    @property
+    def mean(self):
+        '''Mean of the batch losses seen so far; NaN before the first batch.'''
+        return self._mean if self.batches else math.nan
+
+    @property
+    def variance(self):
+        '''Sample variance of the batch losses seen so far.'''
+        return self._m2 / (self.batches - 1) if self.batches > 1 else math.nan
+
+    @property
+    def stopped_early(self):
+        return self.decision is not None
+
+    def update(self, loss):
+        '''Adds one batch loss. Returns True once the outcome is clear and the pass can stop.'''
+        if self.decision is not None:
+            return True
+        loss = float(loss)
+        if math.isnan(loss):
+            # Poison the estimate so the epoch is reported as NaN, as a full pass would be
+            self._mean = math.nan
+        self.batches += 1
+        diff = loss - self._mean
+        self._mean += diff / self.batches
+        self._m2 += diff * (loss - self._mean)
+        self.decision = self._decide()
+        return self.decision is not None
+
+    def _decide(self):
+        if self.threshold is None or self.batches < self.min_batches or math.isnan(self._mean):
+            return None
+        if self.total_batches is not None and self.batches >= self.total_batches:
+            return None
+        variance_of_mean = self.variance / self.batches
+        if self.total_batches is not None:
+            variance_of_mean *= (self.total_batches - self.batches) / (self.total_batches - 1)
+        margin = self._z * math.sqrt(variance_of_mean)
+        if self._mean - margin >= self.threshold:
+            return 'worse'
+        if self.early_exit == 'both' and self._mean + margin < self.threshold:
+            return 'better'
+        return None
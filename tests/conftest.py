@@ -0,0 +1,17 @@
+# tests/conftest.py
+
+import pytest
+import torch
+
+# Fixtures
+
+@pytest.fixture
+def model():
+    """
+    Fixture to create a small real PyTorch model.
+
+    Returns:
+        torch.nn.Module: A linear layer with deterministic weights.
+    """
+    torch.manual_seed(0)
+    return torch.nn.Linear(4, 2)
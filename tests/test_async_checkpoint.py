@@ -0,0 +1,81 @@
+# tests/test_async_checkpoint.py
+
+import threading
+import time
+
+import pytest
+import torch
+from early_stopping_pytorch import EarlyStopping, AsyncCheckpointWriter
+
+# Tests
+
+def test_async_save_writes_snapshot_taken_at_call_time(model, tmp_path):
+    """
+    Test that an asynchronous save persists the weights as they were when EarlyStopping was called.
+
+    The model is modified right after the call returns; the checkpoint on disk must still hold the
+    original weights because a CPU snapshot is taken before handing off to the writer thread.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    early_stopping = EarlyStopping(patience=2, path=path, async_save=True)
+    expected = {k: v.clone() for k, v in model.state_dict().items()}
+
+    early_stopping(1.0, model)
+    # Mutate the weights while the background write may still be running
+    with torch.no_grad():
+        model.weight.add_(10.0)
+    early_stopping.close()
+
+    saved = torch.load(path)
+    for key, value in expected.items():
+        assert torch.equal(saved[key], value), f"Saved {key} should match the weights at call time"
+
+def test_coalesce_policy_drops_stale_snapshots():
+    """
+    Test that with the 'coalesce' policy, a newer snapshot replaces a queued one for the same path.
+
+    The writer is stalled on its first job, so of the three following submissions only the newest
+    should remain queued and eventually be written.
+    """
+    release = threading.Event()
+    written = []
+
+    def slow_save(state_dict, path):
+        release.wait()
+        written.append(state_dict['step'])
+
+    writer = AsyncCheckpointWriter(max_pending=1, policy='coalesce', save_func=slow_save)
+    writer.submit({'step': 0}, 'ckpt.pt')
+    # Wait for the writer thread to pick up the first job so the queue is empty again
+    while not writer._busy:
+        time.sleep(0.01)
+    for step in (1, 2, 3):
+        writer.submit({'step': step}, 'ckpt.pt')
+    release.set()
+    writer.close()
+
+    assert written == [0, 3], "Only the in-flight and the newest snapshots should be written"
+    assert writer.dropped == 2, "Two stale snapshots should have been dropped"
+
+def test_background_error_is_raised_on_next_call(model, tmp_path):
+    """
+    Test that a failed background write is re-raised by the next EarlyStopping call.
+    """
+    path = str(tmp_path / "missing_dir" / "checkpoint.pt")
+    early_stopping = EarlyStopping(patience=2, path=path, async_save=True)
+
+    early_stopping(1.0, model)
+    # Wait for the background write to fail without consuming the error
+    while early_stopping._writer._error is None:
+        time.sleep(0.01)
+
+    with pytest.raises(RuntimeError):
+        early_stopping(0.5, model)
+    early_stopping.close()
+
+def test_invalid_policy_raises():
+    """
+    Test that an unknown pending policy is rejected at construction time.
+    """
+    with pytest.raises(ValueError):
+        AsyncCheckpointWriter(policy='newest')
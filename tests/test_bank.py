@@ -0,0 +1,93 @@
+# tests/test_bank.py
+
+from unittest.mock import Mock, patch
+
+import numpy as np
+import pytest
+import torch
+from early_stopping_pytorch import EarlyStopping, EarlyStoppingBank
+
+# Fixtures
+
+@pytest.fixture
+def mock_models():
+    """
+    Fixture to create mocked PyTorch models, one per bank member.
+
+    Returns:
+        list: Three mocked models with distinct state dicts.
+    """
+    models = []
+    for member in range(3):
+        model = Mock(spec=torch.nn.Module)
+        model.state_dict.return_value = {'member': member}
+        models.append(model)
+    return models
+
+# Tests
+
+def test_bank_matches_scalar_early_stopping():
+    """
+    Test that every bank member follows exactly the same trajectory as an individual EarlyStopping,
+    including per-member patience and delta and NaN epochs.
+    """
+    losses = np.array([
+        [1.0, 1.0, 1.0],
+        [0.98, float('nan'), 0.9],
+        [0.97, 0.95, 0.95],
+        [0.97, 0.96, 0.8],
+        [0.95, 0.97, 0.85],
+        [0.95, 0.98, 0.86],
+    ])
+    patience = [3, 2, 1]
+    delta = [0.01, 0.0, 0.0]
+    bank = EarlyStoppingBank(3, patience=patience, delta=delta, trace_func=lambda msg: None)
+    singles = [EarlyStopping(patience=p, delta=d, trace_func=lambda msg: None) for p, d in zip(patience, delta)]
+
+    with patch.object(EarlyStopping, 'save_checkpoint'):
+        for row in losses:
+            bank(row)
+            for single, loss in zip(singles, row):
+                single(loss, None)
+
+    assert bank.counter.tolist() == [s.counter for s in singles], "Counters should match EarlyStopping"
+    assert bank.early_stop.tolist() == [s.early_stop for s in singles], "Stop flags should match EarlyStopping"
+    assert bank.best_val_loss.tolist() == [s.best_val_loss for s in singles], "Best losses should match"
+
+def test_bank_only_checkpoints_improved_members(mock_models, tmp_path):
+    """
+    Test that only members that improved are saved, each to its own path.
+    """
+    path = str(tmp_path / "member{member}.pt")
+    bank = EarlyStoppingBank(3, patience=2, path=path, trace_func=lambda msg: None)
+
+    with patch('early_stopping_pytorch.bank.torch.save') as mock_save:
+        bank([1.0, 1.0, 1.0], mock_models)
+        improved, early_stop = bank([0.9, 1.1, float('nan')], mock_models)
+
+        assert improved.tolist() == [True, False, False], "Only member 0 should improve"
+        assert not early_stop.any(), "No member should be stopped yet"
+        assert mock_save.call_count == 4, "Three initial saves and one save for member 0"
+        mock_save.assert_called_with({'member': 0}, str(tmp_path / "member0.pt"))
+
+def test_bank_accepts_torch_tensor_losses():
+    """
+    Test that a tensor of losses is accepted and that a wrong number of losses is rejected.
+    """
+    bank = EarlyStoppingBank(2, patience=1, trace_func=lambda msg: None)
+    bank(torch.tensor([1.0, 1.0]))
+    _, early_stop = bank(torch.tensor([0.5, 2.0]))
+
+    assert early_stop.tolist() == [False, True], "Only the member that got worse should stop"
+    with pytest.raises(ValueError):
+        bank([1.0, 2.0, 3.0])
+
+def test_bank_without_trace_func():
+    """
+    Test that trace_func=None disables the messages instead of failing.
+    """
+    bank = EarlyStoppingBank(2, patience=1, verbose=True, trace_func=None)
+    bank([1.0, float('nan')])
+    _, early_stop = bank([2.0, 1.0])
+
+    assert early_stop.tolist() == [True, False]
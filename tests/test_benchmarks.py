@@ -0,0 +1,27 @@
+# tests/test_benchmarks.py
+
+import json
+import os
+import subprocess
+import sys
+
+RUNNER = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'benchmarks', 'run_benchmarks.py')
+
+# Tests
+
+def test_benchmark_suite_smoke(tmp_path):
+    """
+    Test that the benchmark runner completes on tiny sizes and writes JSON with every requested section.
+
+    This keeps the suite from silently breaking as the EarlyStopping API evolves.
+    """
+    output = tmp_path / "results.json"
+    subprocess.run([sys.executable, RUNNER, '--quick', '--params', '1e4', '--output', str(output)],
+                   check=True, capture_output=True)
+
+    with open(output) as f:
+        results = json.load(f)
+    assert set(results) == {'environment', 'overhead', 'checkpoint', 'scaling', 'encoders'}, \
+        "Every suite should be present in the output"
+    assert {r['mode'] for r in results['checkpoint']} >= {'sync', 'async', 'in_memory'}, \
+        "New save modes should be compared against the synchronous path"
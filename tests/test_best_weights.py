@@ -0,0 +1,69 @@
+# tests/test_best_weights.py
+
+from unittest.mock import patch
+
+import pytest
+import torch
+from early_stopping_pytorch import EarlyStopping
+from early_stopping_pytorch.best_weights import BestWeightsBuffer
+
+# Tests
+
+def test_in_memory_mode_skips_disk_and_restores_best(model, tmp_path):
+    """
+    Test that in-memory mode never writes to disk and that restore_best() brings back the best weights.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    with patch('early_stopping_pytorch.early_stopping.torch.save') as mock_save:
+        early_stopping = EarlyStopping(patience=3, path=path, in_memory=True)
+
+        early_stopping(1.0, model)
+        best = {k: v.clone() for k, v in model.state_dict().items()}
+        with torch.no_grad():
+            model.weight.add_(1.0)
+        # Worse loss: the modified weights must not replace the best ones
+        early_stopping(2.0, model)
+        early_stopping.restore_best(model)
+
+        assert mock_save.call_count == 0, "In-memory mode should not write any checkpoint"
+    for key, value in best.items():
+        assert torch.equal(model.state_dict()[key], value), f"{key} should be restored to the best weights"
+
+def test_buffers_are_reused_across_improvements(model):
+    """
+    Test that subsequent updates copy into the same preallocated tensors instead of allocating new ones.
+    """
+    buffer = BestWeightsBuffer()
+    buffer.update(model.state_dict())
+    pointers = {k: v.data_ptr() for k, v in buffer.state_dict().items()}
+
+    with torch.no_grad():
+        model.weight.mul_(2.0)
+    buffer.update(model.state_dict())
+
+    assert {k: v.data_ptr() for k, v in buffer.state_dict().items()} == pointers, "Buffers should be reused"
+    assert torch.equal(buffer.state_dict()['weight'], model.weight), "Buffer should hold the latest weights"
+
+def test_save_on_stop_writes_once(model, tmp_path):
+    """
+    Test that save_on_stop persists the in-memory best weights exactly once when early stopping triggers.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    early_stopping = EarlyStopping(patience=1, path=path, in_memory=True, save_on_stop=True)
+
+    with patch('early_stopping_pytorch.early_stopping.torch.save') as mock_save:
+        for loss in [1.0, 0.9, 0.8, 0.95]:
+            early_stopping(loss, model)
+        early_stopping.close()
+
+        assert early_stopping.early_stop, "Early stop should be triggered"
+        assert mock_save.call_count == 1, "Best weights should be written exactly once"
+        assert mock_save.call_args[0][1] == path, "Best weights should be written to path"
+
+def test_restore_best_without_recorded_weights_raises(model):
+    """
+    Test that restore_best() fails clearly when no improvement has been recorded yet.
+    """
+    early_stopping = EarlyStopping(in_memory=True)
+    with pytest.raises(RuntimeError):
+        early_stopping.restore_best(model)
@@ -0,0 +1,107 @@
+# tests/test_checkpoint.py
+
+import random
+from unittest.mock import patch
+
+import numpy as np
+import pytest
+import torch
+from early_stopping_pytorch import EarlyStopping
+from early_stopping_pytorch.checkpoint import capture_rng_state, restore_rng_state, load_checkpoint
+
+# Fixtures
+
+@pytest.fixture
+def training_setup():
+    """
+    Fixture to create a small model with an optimizer and scheduler that already hold state.
+
+    Returns:
+        tuple: (model, optimizer, scheduler)
+    """
+    torch.manual_seed(0)
+    model = torch.nn.Linear(4, 2)
+    optimizer = torch.optim.Adam(model.parameters(), lr=0.1)
+    scheduler = torch.optim.lr_scheduler.StepLR(optimizer, step_size=1, gamma=0.5)
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    scheduler.step()
+    return model, optimizer, scheduler
+
+def _train_step(model, optimizer, scheduler):
+    optimizer.zero_grad()
+    model(torch.randn(3, 4)).sum().backward()
+    optimizer.step()
+    scheduler.step()
+
+# Tests
+
+@pytest.mark.parametrize('async_save', [False, True])
+def test_restore_best_restores_full_training_state(training_setup, tmp_path, async_save):
+    """
+    Test that the optimizer and scheduler state of the best epoch are saved with the model and restored.
+    """
+    model, optimizer, scheduler = training_setup
+    early_stopping = EarlyStopping(patience=3, path=str(tmp_path / "checkpoint.pt"), optimizer=optimizer,
+                                   scheduler=scheduler, async_save=async_save, trace_func=lambda msg: None)
+    early_stopping(1.0, model)
+    best_weight = model.weight.detach().clone()
+    best_exp_avg = optimizer.state[model.weight]['exp_avg'].clone()
+    best_lr = scheduler.get_last_lr()
+
+    _train_step(model, optimizer, scheduler)
+    early_stopping(2.0, model)
+    early_stopping.restore_best(model, optimizer, scheduler)
+
+    assert torch.equal(model.weight, best_weight), "Model weights should be restored"
+    assert torch.equal(optimizer.state[model.weight]['exp_avg'], best_exp_avg), "Optimizer state should be restored"
+    assert scheduler.get_last_lr() == best_lr, "Scheduler state should be restored"
+    early_stopping.close()
+
+def test_load_checkpoint_memory_maps(training_setup, tmp_path):
+    """
+    Test that checkpoints are loaded with mmap and that a plain state dict checkpoint still loads.
+    """
+    model, _, _ = training_setup
+    path = str(tmp_path / "checkpoint.pt")
+    torch.save(model.state_dict(), path)
+
+    with patch('early_stopping_pytorch.checkpoint.torch.load', wraps=torch.load) as mock_load:
+        checkpoint = load_checkpoint(path, model)
+
+    assert mock_load.call_args.kwargs['mmap'] is True, "The checkpoint should be memory-mapped"
+    assert torch.equal(checkpoint['weight'], model.weight), "A single tensor should be readable from the mapping"
+
+def test_load_checkpoint_without_assign_supports_old_torch(training_setup, tmp_path):
+    """
+    Test that assign is only passed to load_state_dict() when requested, as torch < 2.1 does not accept it.
+    """
+    model, _, _ = training_setup
+    path = str(tmp_path / "checkpoint.pt")
+    torch.save(model.state_dict(), path)
+
+    with patch.object(model, 'load_state_dict', wraps=model.load_state_dict) as mock_load_state_dict:
+        load_checkpoint(path, model)
+
+    assert 'assign' not in mock_load_state_dict.call_args.kwargs, "assign should not be passed by default"
+
+def test_rng_state_round_trip():
+    """
+    Test that restoring the captured RNG state reproduces the same random draws.
+    """
+    state = capture_rng_state()
+    expected = (random.random(), np.random.rand(), torch.rand(1).item())
+    restore_rng_state(state)
+
+    assert (random.random(), np.random.rand(), torch.rand(1).item()) == expected, "Draws should repeat"
+
+def test_missing_state_is_reported(training_setup, tmp_path):
+    """
+    Test that asking for state the checkpoint does not hold raises a KeyError.
+    """
+    model, optimizer, scheduler = training_setup
+    early_stopping = EarlyStopping(path=str(tmp_path / "checkpoint.pt"), optimizer=optimizer)
+    early_stopping(1.0, model)
+
+    with pytest.raises(KeyError):
+        early_stopping.restore_best(model, scheduler=scheduler)
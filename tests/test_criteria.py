@@ -0,0 +1,127 @@
+# tests/test_criteria.py
+
+import json
+import random
+import statistics
+
+import pytest
+from early_stopping_pytorch import (EarlyStopping, EMASmoothing, MedianSmoothing, SlopeCriterion,
+                                    RelativeImprovementCriterion, LearningCurveCriterion)
+from early_stopping_pytorch.criteria import RingBuffer
+
+# Tests
+
+def test_ring_buffer_keeps_most_recent_values():
+    """
+    Test that the ring buffer evicts the oldest value once full and reports values oldest first.
+    """
+    buffer = RingBuffer(3)
+    evicted = [buffer.append(value) for value in range(5)]
+
+    assert evicted == [None, None, None, 0, 1]
+    assert buffer.values() == [2, 3, 4]
+    assert (buffer.first(), buffer.last()) == (2, 4)
+
+def test_smoothed_loss_is_compared(model, tmp_path):
+    """
+    Test that the improvement test and best_val_loss use the smoothed loss: a repeated raw loss still
+    improves the moving average and does not count against patience.
+    """
+    early_stopping = EarlyStopping(patience=1, path=str(tmp_path / "checkpoint.pt"),
+                                   smoothing=EMASmoothing(alpha=0.5))
+
+    for val_loss in [1.0, 0.5, 0.5]:
+        early_stopping(val_loss, model)
+
+    assert not early_stopping.early_stop, "The moving average keeps improving"
+    assert early_stopping.best_val_loss == 0.625, "best_val_loss holds the smoothed value"
+
+def test_median_smoothing_ignores_a_spike():
+    """
+    Test that the windowed median is not pulled up by a single outlier.
+    """
+    smoothing = MedianSmoothing(3)
+
+    assert [smoothing.update(loss) for loss in [1.0, 0.9, 5.0, 0.8]] == [1.0, 0.95, 1.0, 0.9]
+
+def test_slope_criterion_stops_on_plateau_before_patience(model, tmp_path):
+    """
+    Test that a slowly improving plateau stops through the slope test long before patience runs out.
+    """
+    events = []
+    criterion = SlopeCriterion(window=5, min_decrease=0.01)
+    early_stopping = EarlyStopping(patience=100, path=str(tmp_path / "checkpoint.pt"), criteria=[criterion],
+                                   callbacks=[events.append])
+
+    losses = [1.0, 0.9] + [0.8 - 0.001 * step for step in range(20)]
+    for epoch, val_loss in enumerate(losses, start=1):
+        early_stopping(val_loss, model)
+        if early_stopping.early_stop:
+            break
+
+    assert epoch == 7, "The plateau should be detected once the window only covers it"
+    assert criterion.slope == pytest.approx(-0.001)
+    assert events[-1].name == 'stopped' and events[-1].data['reason'] == 'SlopeCriterion'
+
+def test_relative_improvement_criterion():
+    """
+    Test that the relative improvement test compares the loss with the one window epochs earlier.
+    """
+    criterion = RelativeImprovementCriterion(window=2, min_improvement=0.1)
+
+    assert [criterion.update(epoch, loss) for epoch, loss in enumerate([1.0, 0.8, 0.7, 0.75], start=1)] \
+        == [False, False, False, True]
+
+def test_learning_curve_criterion_predicts_unreachable_improvement():
+    """
+    Test that a curve flattening towards an asymptote stops once delta is out of reach within the budget,
+    while a curve with plenty of headroom keeps going.
+    """
+    flattening = LearningCurveCriterion(max_epochs=100, delta=0.01)
+    headroom = LearningCurveCriterion(max_epochs=100, delta=0.01)
+
+    flat_decisions = [flattening.update(epoch, 0.5 + 0.5 / epoch) for epoch in range(1, 101)]
+    headroom_decisions = [headroom.update(epoch, 0.5 + 5.0 / epoch) for epoch in range(1, 21)]
+
+    assert flat_decisions.index(True) < 60, "Remaining improvement of 0.5 / epoch should fall below delta"
+    assert flattening.predicted == pytest.approx(0.505)
+    assert not any(headroom_decisions), "0.2 of improvement is still ahead"
+
+def test_criteria_state_survives_resume(model, tmp_path):
+    """
+    Test that smoothing and criterion windows are part of the persisted state.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    early_stopping = EarlyStopping(path=path, resume=True, smoothing=EMASmoothing(0.5),
+                                   criteria=[SlopeCriterion(window=3)])
+    for val_loss in [1.0, 0.8]:
+        early_stopping(val_loss, model)
+
+    resumed = EarlyStopping(path=path, resume=True, smoothing=EMASmoothing(0.5), criteria=[SlopeCriterion(window=3)])
+
+    assert json.loads(json.dumps(resumed.state_dict())) == early_stopping.state_dict()
+    assert resumed.smoothing.value == 0.9
+    resumed(0.9, model)
+    assert resumed.criteria[0].slope == pytest.approx(-0.05)
+
+def test_criteria_require_host_losses():
+    """
+    Test that smoothing and criteria are rejected with deferred device-side comparisons.
+    """
+    with pytest.raises(ValueError):
+        EarlyStopping(sync_every=None, criteria=[SlopeCriterion()])
+
+def test_median_smoothing_matches_full_median():
+    """
+    Test that the incrementally sorted window gives the same median as sorting the window each time,
+    including after a state round trip.
+    """
+    rng = random.Random(0)
+    losses = [rng.random() for _ in range(50)]
+    smoothing = MedianSmoothing(4)
+    for index, loss in enumerate(losses):
+        assert smoothing.update(loss) == statistics.median(losses[max(0, index - 3):index + 1])
+
+    restored = MedianSmoothing(4)
+    restored.load_state_dict(smoothing.state_dict())
+    assert restored.update(0.5) == statistics.median(losses[-3:] + [0.5])
@@ -0,0 +1,108 @@
+# tests/test_device_losses.py
+
+from unittest.mock import patch
+
+import pytest
+import torch
+from early_stopping_pytorch import EarlyStopping
+from early_stopping_pytorch import device_state
+
+# Fixtures
+
+@pytest.fixture
+def sync_counter():
+    """
+    Fixture that counts host synchronizations by wrapping the sync point of the deferred device state.
+
+    Yields:
+        Mock: The wrapping mock; its call_count is the number of host synchronizations.
+    """
+    with patch('early_stopping_pytorch.device_state._host_sync', wraps=device_state._host_sync) as mock_sync:
+        yield mock_sync
+
+# Tests
+
+def test_tensor_losses_match_float_semantics(model, tmp_path):
+    """
+    Test that tensor losses with the default sync_every=1 behave exactly like Python floats.
+    """
+    losses = [1.0, 0.98, 0.97, 0.97, 0.95, 0.95, 1.0, 1.1]
+    with patch.object(EarlyStopping, 'save_checkpoint') as mock_save_checkpoint:
+        early_stopping = EarlyStopping(patience=3, delta=0.01, path=str(tmp_path / "checkpoint.pt"))
+        for loss in losses:
+            early_stopping(torch.tensor(loss), model)
+
+        assert mock_save_checkpoint.call_count == 3, "Checkpoints should be saved on initial and two improvements"
+        assert early_stopping.counter == 3, "Counter should be incremented to 3"
+        assert early_stopping.early_stop is True, "Early stop should be triggered after patience is exceeded"
+
+def test_deferred_mode_syncs_only_when_early_stop_is_read(model, tmp_path, sync_counter):
+    """
+    Test that with sync_every=None no host synchronization happens until early_stop is read,
+    and that the checkpoint then holds the weights of the best epoch.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    early_stopping = EarlyStopping(patience=2, path=path, sync_every=None, trace_func=lambda msg: None)
+
+    best_weights = None
+    for loss in [1.0, 0.5, 0.7, 0.8]:
+        early_stopping(torch.tensor(loss), model)
+        if loss == 0.5:
+            best_weights = model.weight.detach().clone()
+        # Simulate a training step between validations
+        with torch.no_grad():
+            model.weight.add_(1.0)
+
+    assert sync_counter.call_count == 0, "No host sync should happen before early_stop is read"
+    assert early_stopping.early_stop is True, "Early stop should be triggered after patience is exceeded"
+    assert sync_counter.call_count == 1, "Reading early_stop should cause exactly one host sync"
+    assert early_stopping.best_val_loss == 0.5, "Best loss should be synced to the host"
+    assert torch.equal(torch.load(path)['weight'], best_weights), "Checkpoint should hold the best epoch's weights"
+
+def test_sync_cadence(model, tmp_path, sync_counter):
+    """
+    Test that sync_every=N synchronizes once every N calls.
+    """
+    early_stopping = EarlyStopping(patience=100, path=str(tmp_path / "checkpoint.pt"), sync_every=3)
+    with patch('early_stopping_pytorch.early_stopping.torch.save'):
+        for step in range(9):
+            early_stopping(torch.tensor(1.0 / (step + 1)), model)
+
+    assert sync_counter.call_count == 3, "Nine calls with sync_every=3 should sync three times"
+    assert early_stopping.counter == 0, "Counter should stay at 0 while losses improve"
+
+def test_nan_tensor_loss_is_ignored_on_device(model, tmp_path):
+    """
+    Test that a NaN tensor loss neither changes the counter nor the best loss in deferred mode.
+    """
+    early_stopping = EarlyStopping(patience=3, path=str(tmp_path / "checkpoint.pt"), sync_every=None)
+    with patch('early_stopping_pytorch.early_stopping.torch.save'):
+        for loss in [1.0, float('nan'), 0.9]:
+            early_stopping(torch.tensor(loss), model)
+
+        assert not early_stopping.early_stop, "Early stop should not be triggered"
+    assert early_stopping.counter == 0, "Counter should remain 0 since NaN loss was ignored"
+    assert early_stopping.best_val_loss == pytest.approx(0.9), "Best loss should be the last improvement"
+
+def test_deferred_weights_are_updated_in_place(model, tmp_path):
+    """
+    Test that the device copy of the best weights keeps its storage across calls, and that it is not
+    allocated at all without a model.
+    """
+    early_stopping = EarlyStopping(patience=3, path=str(tmp_path / "checkpoint.pt"), sync_every=None)
+    early_stopping(torch.tensor(1.0), model)
+    pointer = early_stopping._device_state.weights['weight'].data_ptr()
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    early_stopping(torch.tensor(0.5), model)
+
+    assert early_stopping._device_state.weights['weight'].data_ptr() == pointer, "Copy should be reused"
+    assert torch.equal(early_stopping._device_state.weights['weight'], model.weight)
+
+    without_model = EarlyStopping(patience=1, path=str(tmp_path / "unused.pt"), sync_every=None)
+    for loss in [1.0, 2.0]:
+        without_model(torch.tensor(loss), None)
+
+    assert without_model._device_state.weights is None
+    assert without_model.early_stop and without_model.best_val_loss == 1.0
+    assert not (tmp_path / "unused.pt").exists()
@@ -0,0 +1,76 @@
+# tests/test_distributed.py
+
+import json
+import os
+
+import pytest
+import torch
+import torch.distributed as dist
+import torch.multiprocessing as mp
+from early_stopping_pytorch import EarlyStopping
+
+pytestmark = pytest.mark.skipif(not (dist.is_available() and dist.is_gloo_available()),
+                                reason="torch.distributed with the gloo backend is not available")
+
+WORLD_SIZE = 2
+
+# Per-rank losses: they differ, but their mean improves twice and then stalls for two epochs
+RANK_LOSSES = [
+    [1.0, 0.8, 0.6, 0.7, 0.7],
+    [1.0, 0.9, 0.5, 0.4, 0.4],
+]
+
+def _run_rank(rank, tmp_dir, shard_checkpoints):
+    """
+    Worker process: runs EarlyStopping on one rank of a gloo process group and records its decisions.
+    """
+    dist.init_process_group('gloo', init_method=f'file://{os.path.join(tmp_dir, "init")}',
+                            rank=rank, world_size=WORLD_SIZE)
+    try:
+        torch.manual_seed(rank)
+        model = torch.nn.Linear(2, 1)
+        path = os.path.join(tmp_dir, "checkpoint.pt")
+        early_stopping = EarlyStopping(patience=2, path=path, distributed=True,
+                                       shard_checkpoints=shard_checkpoints, trace_func=lambda msg: None)
+        stopped_at = None
+        for epoch, loss in enumerate(RANK_LOSSES[rank]):
+            early_stopping(loss, model)
+            if early_stopping.early_stop:
+                stopped_at = epoch
+                break
+        with open(os.path.join(tmp_dir, f"result{rank}.json"), "w") as f:
+            json.dump({'stopped_at': stopped_at, 'best': early_stopping.best_val_loss}, f)
+    finally:
+        dist.destroy_process_group()
+
+def _spawn(tmp_path, shard_checkpoints):
+    mp.spawn(_run_rank, args=(str(tmp_path), shard_checkpoints), nprocs=WORLD_SIZE, join=True)
+    results = []
+    for rank in range(WORLD_SIZE):
+        with open(tmp_path / f"result{rank}.json") as f:
+            results.append(json.load(f))
+    return results
+
+# Tests
+
+def test_ranks_stop_together_and_only_rank_zero_saves(tmp_path):
+    """
+    Test that ranks with different local losses reach the same decision on the averaged loss,
+    and that only rank 0 writes the checkpoint.
+    """
+    results = _spawn(tmp_path, shard_checkpoints=False)
+
+    assert results[0] == results[1], "All ranks should agree on the stopping epoch and best loss"
+    assert results[0]['stopped_at'] == 4, "Ranks should stop after two epochs without improvement"
+    assert results[0]['best'] == pytest.approx(0.55), "Best loss should be the mean over ranks"
+    checkpoints = sorted(p.name for p in tmp_path.glob("*.pt"))
+    assert checkpoints == ["checkpoint.pt"], "Only a single checkpoint should be written"
+
+def test_sharded_checkpoints_write_one_file_per_rank(tmp_path):
+    """
+    Test that shard_checkpoints makes every rank write its own checkpoint file.
+    """
+    _spawn(tmp_path, shard_checkpoints=True)
+
+    checkpoints = sorted(p.name for p in tmp_path.glob("*.pt"))
+    assert checkpoints == ["checkpoint.rank0.pt", "checkpoint.rank1.pt"], "Each rank should write its own shard"
@@ -0,0 +1,98 @@
+# tests/test_encoders.py
+
+import os
+
+import pytest
+import torch
+from early_stopping_pytorch import (EarlyStopping, CheckpointEncoder, CheckpointRetention, HalfPrecisionEncoder,
+                                    CompressedEncoder)
+
+# Fixtures
+
+@pytest.fixture
+def model():
+    """
+    Fixture to create a small real PyTorch model with a normalization layer.
+
+    Returns:
+        torch.nn.Sequential: A linear layer followed by batch normalization.
+    """
+    torch.manual_seed(0)
+    return torch.nn.Sequential(torch.nn.Linear(64, 64), torch.nn.BatchNorm1d(64))
+
+# Tests
+
+@pytest.mark.parametrize('method', ['zlib', 'lzma', 'bz2'])
+def test_compressed_round_trip(model, tmp_path, method):
+    """
+    Test that a compressed checkpoint decodes to exactly the saved state dict.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    encoder = CompressedEncoder(method, chunk_size=1024)
+    encoder.save(model.state_dict(), path)
+    restored = encoder.load(path)
+
+    for key, value in model.state_dict().items():
+        assert torch.equal(restored[key], value), f"{key} should survive compression unchanged"
+
+def test_half_precision_halves_size_and_keeps_selected_keys(model, tmp_path):
+    """
+    Test that half-precision storage shrinks the checkpoint, restores the original dtypes and leaves
+    keys matching keep_full_precision exact.
+    """
+    full_path, half_path = str(tmp_path / "full.pt"), str(tmp_path / "half.pt")
+    CheckpointEncoder().save(model.state_dict(), full_path)
+    encoder = HalfPrecisionEncoder(torch.bfloat16, keep_full_precision=('1.*',))
+    encoder.save(model.state_dict(), half_path)
+    restored = encoder.load(half_path)
+
+    assert os.path.getsize(half_path) < 0.7 * os.path.getsize(full_path), "Half precision should be smaller"
+    assert restored['0.weight'].dtype == torch.float32, "Original dtype should be restored"
+    assert torch.allclose(restored['0.weight'], model[0].weight, atol=1e-2), "Weights should be close"
+    assert torch.equal(restored['1.running_var'], model[1].running_var), "Kept keys should be exact"
+    assert restored['1.num_batches_tracked'].dtype == torch.int64, "Integer tensors should be untouched"
+
+def test_early_stopping_with_stacked_encoders(model, tmp_path):
+    """
+    Test that EarlyStopping writes through a half-precision encoder stacked on compression and that
+    restore_best() decodes it.
+    """
+    encoder = HalfPrecisionEncoder(inner=CompressedEncoder('zlib'))
+    early_stopping = EarlyStopping(patience=2, path=str(tmp_path / "checkpoint.pt"), encoder=encoder,
+                                   trace_func=lambda msg: None)
+    early_stopping(1.0, model)
+    best = model[0].weight.detach().clone()
+    with torch.no_grad():
+        model[0].weight.add_(1.0)
+    early_stopping.restore_best(model)
+
+    assert torch.allclose(model[0].weight, best, atol=1e-3), "Best weights should be restored from the encoding"
+
+def test_invalid_encoder_arguments():
+    """
+    Test that unsupported codecs and dtypes are rejected.
+    """
+    with pytest.raises(ValueError):
+        CompressedEncoder('zstd')
+    with pytest.raises(ValueError):
+        HalfPrecisionEncoder(torch.float64)
+
+def test_retention_writes_through_encoder(model, tmp_path):
+    """
+    Test that top-k checkpoints are encoded like the default path, so restore_best() can decode them, and
+    that a retention with its own save function is rejected.
+    """
+    retention = CheckpointRetention(str(tmp_path), k=2)
+    early_stopping = EarlyStopping(patience=3, retention=retention, encoder=CompressedEncoder('zlib'),
+                                   trace_func=None)
+    expected = {key: value.clone() for key, value in model.state_dict().items()}
+    early_stopping(1.0, model)
+    with torch.no_grad():
+        model[0].weight.add_(1.0)
+    early_stopping(1.5, model)
+
+    early_stopping.restore_best(model)
+    assert torch.equal(model[0].weight, expected['0.weight']), "The best checkpoint should decode"
+    with pytest.raises(ValueError):
+        EarlyStopping(retention=CheckpointRetention(str(tmp_path / "other"), save_func=torch.save),
+                      encoder=CompressedEncoder())
@@ -0,0 +1,98 @@
+# tests/test_events.py
+
+import os
+
+from early_stopping_pytorch import EarlyStopping, EventLog
+
+# Tests
+
+def test_callbacks_receive_events_in_order(model, tmp_path):
+    """
+    Test that callbacks see improvements, checkpoint timing, NaN skips, counter increments and the stop,
+    in the order they happened and tagged with the epoch.
+    """
+    events = []
+    path = str(tmp_path / "checkpoint.pt")
+    early_stopping = EarlyStopping(patience=2, path=path, callbacks=[events.append])
+
+    for val_loss in [1.0, float('nan'), 1.5, 1.5]:
+        early_stopping(val_loss, model)
+
+    assert [e.name for e in events] == ['improved', 'checkpoint_started', 'checkpoint_finished', 'nan_skipped',
+                                        'no_improvement', 'no_improvement', 'stopped']
+    assert [e.epoch for e in events] == [1, 1, 1, 2, 3, 4, 4]
+    finished = events[2].data
+    assert finished['path'] == path, "The finished event should name the checkpoint file"
+    assert finished['bytes'] == os.path.getsize(path), "The finished event should report the file size"
+    assert finished['duration'] >= 0, "The finished event should report the write duration"
+    assert events[5].data['counter'] == 2, "no_improvement should carry the counter"
+
+def test_metrics_count_events_and_bytes(model, tmp_path):
+    """
+    Test that metrics aggregate event counts, checkpoint bytes and time spent in calls and writes.
+    """
+    early_stopping = EarlyStopping(patience=5, path=str(tmp_path / "checkpoint.pt"))
+
+    for val_loss in [1.0, 0.9, 1.2]:
+        early_stopping(val_loss, model)
+
+    metrics = early_stopping.metrics
+    assert metrics['events.improved'] == 2
+    assert metrics['events.no_improvement'] == 1
+    assert metrics['events.checkpoint_finished'] == 2
+    assert metrics['checkpoint.bytes_written'] == 2 * os.path.getsize(early_stopping.checkpoint_path)
+    assert metrics['time.call_seconds'] >= metrics['time.checkpoint_seconds'] > 0
+
+def test_stopped_is_emitted_once(model, tmp_path):
+    """
+    Test that calls after patience ran out do not report the stop again.
+    """
+    early_stopping = EarlyStopping(patience=1, path=str(tmp_path / "checkpoint.pt"), trace_func=None)
+
+    for val_loss in [1.0, 1.1, 1.2, 1.3]:
+        early_stopping(val_loss, model)
+
+    assert early_stopping.early_stop is True
+    assert early_stopping.metrics['events.stopped'] == 1, "The stop should be reported once"
+
+def test_ring_buffer_keeps_most_recent_events():
+    """
+    Test that the ring buffer holds only the last buffer_size events while the counters keep the totals.
+    """
+    log = EventLog(buffer_size=2)
+    for epoch in range(1, 6):
+        log.emit('no_improvement', epoch, counter=epoch)
+
+    assert [e.epoch for e in log.buffer] == [4, 5]
+    assert log.metrics()['events.no_improvement'] == 5
+
+def test_background_write_reports_finished_event(model, tmp_path):
+    """
+    Test that a background save emits checkpoint_finished from the writer thread with the epoch it was
+    submitted for.
+    """
+    finished = []
+    early_stopping = EarlyStopping(patience=2, path=str(tmp_path / "checkpoint.pt"), async_save=True,
+                                   callbacks=[lambda e: e.name == 'checkpoint_finished' and finished.append(e)])
+
+    early_stopping(1.0, model)
+    early_stopping.flush()
+
+    assert len(finished) == 1 and finished[0].epoch == 1
+    assert finished[0].data['bytes'] == os.path.getsize(early_stopping.checkpoint_path)
+    early_stopping.close()
+
+def test_no_trace_formatting_without_trace_func(model, tmp_path):
+    """
+    Test that with trace_func=None the messages are never built, even when verbose is set.
+    """
+    class Loss(float):
+        def __format__(self, spec):
+            raise AssertionError("Loss should not be formatted")
+
+    early_stopping = EarlyStopping(patience=2, verbose=True, trace_func=None, path=str(tmp_path / "checkpoint.pt"))
+
+    for val_loss in [Loss(1.0), Loss(0.5), Loss(0.7), Loss(0.7)]:
+        early_stopping(val_loss, model)
+
+    assert early_stopping.early_stop, "Stopping should work without a trace function"
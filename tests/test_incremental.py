@@ -0,0 +1,118 @@
+# tests/test_incremental.py
+
+import os
+
+import pytest
+import torch
+from early_stopping_pytorch import (EarlyStopping, CheckpointRetention, CompressedEncoder, IncrementalCheckpointWriter,
+                                    load_incremental)
+
+# Fixtures
+
+@pytest.fixture
+def adapter_model():
+    """
+    Fixture to create a model with a large frozen backbone and a small trainable head.
+
+    Returns:
+        torch.nn.Sequential: The model; only its last layer requires gradients.
+    """
+    torch.manual_seed(0)
+    model = torch.nn.Sequential(torch.nn.Linear(256, 256), torch.nn.BatchNorm1d(256), torch.nn.Linear(256, 2))
+    for param in model[0].parameters():
+        param.requires_grad_(False)
+    return model
+
+def _update_head(model):
+    with torch.no_grad():
+        model[2].weight.add_(0.1)
+
+# Tests
+
+@pytest.mark.parametrize('change_detection', ['hash', 'version'])
+def test_deltas_only_hold_changed_tensors(adapter_model, tmp_path, change_detection):
+    """
+    Test that after the base snapshot only the changed head is written, and that the latest state is
+    reconstructed exactly.
+    """
+    writer = IncrementalCheckpointWriter(str(tmp_path / "ckpt"), change_detection=change_detection)
+    writer.save(adapter_model.state_dict())
+    base_bytes = writer.last_bytes_written
+
+    _update_head(adapter_model)
+    writer.save(adapter_model.state_dict())
+
+    assert writer.last_bytes_written < base_bytes / 10, "A delta should be much smaller than the base"
+    restored = load_incremental(str(tmp_path / "ckpt"))
+    for key, value in adapter_model.state_dict().items():
+        assert torch.equal(restored[key], value), f"{key} should match the latest saved state"
+    assert restored._metadata == adapter_model.state_dict()._metadata, "Module metadata should be preserved"
+
+def test_compaction_writes_new_base_and_removes_old_files(adapter_model, tmp_path):
+    """
+    Test that after compact_every deltas the next save writes a new base and deletes the old files.
+    """
+    path = tmp_path / "ckpt"
+    writer = IncrementalCheckpointWriter(str(path), compact_every=2)
+    for _ in range(4):
+        writer.save(adapter_model.state_dict())
+        _update_head(adapter_model)
+
+    assert sorted(os.listdir(path)) == ["base-000003.pt", "manifest.json"], "Only the new base should remain"
+    restored = load_incremental(str(path))
+    assert not torch.equal(restored['2.weight'], adapter_model[2].weight), "The last update was not saved"
+
+def test_early_stopping_with_incremental_training_state(adapter_model, tmp_path):
+    """
+    Test that EarlyStopping writes incremental checkpoints of a full training state and restores them.
+    """
+    optimizer = torch.optim.SGD([p for p in adapter_model.parameters() if p.requires_grad], lr=0.1, momentum=0.9)
+    writer = IncrementalCheckpointWriter(str(tmp_path / "ckpt"))
+    early_stopping = EarlyStopping(patience=2, incremental=writer, optimizer=optimizer, trace_func=lambda msg: None)
+
+    early_stopping(1.0, adapter_model)
+    _update_head(adapter_model)
+    early_stopping(0.5, adapter_model)
+    best_head = adapter_model[2].weight.detach().clone()
+    _update_head(adapter_model)
+    early_stopping(0.7, adapter_model)
+    early_stopping.restore_best(adapter_model, optimizer)
+
+    assert torch.equal(adapter_model[2].weight, best_head), "The best head should be restored"
+
+def test_incremental_and_retention_are_exclusive(tmp_path):
+    """
+    Test that combining incremental checkpoints with top-k retention is rejected.
+    """
+    with pytest.raises(ValueError):
+        EarlyStopping(incremental=IncrementalCheckpointWriter(str(tmp_path / "a")),
+                      retention=CheckpointRetention(str(tmp_path / "b")))
+
+@pytest.mark.parametrize('option', [{'async_save': True}, {'encoder': CompressedEncoder()},
+                                    {'in_memory': True, 'save_on_stop': True}])
+def test_incremental_rejects_options_it_would_ignore(tmp_path, option):
+    """
+    Test that async_save, encoder and in_memory, which incremental writes do not use, are rejected instead of
+    ignored.
+    """
+    with pytest.raises(ValueError):
+        EarlyStopping(incremental=IncrementalCheckpointWriter(str(tmp_path)), **option)
+
+def test_resume_ignores_state_without_incremental_base(adapter_model, tmp_path):
+    """
+    Test that a resume state is not trusted when the incremental directory exists but holds no base snapshot.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    directory = tmp_path / "ckpt"
+    first_run = EarlyStopping(path=path, resume=True, incremental=IncrementalCheckpointWriter(str(directory)),
+                              trace_func=None)
+    first_run(1.0, adapter_model)
+    for name in os.listdir(directory):
+        os.remove(directory / name)
+
+    messages = []
+    second_run = EarlyStopping(path=path, resume=True, incremental=IncrementalCheckpointWriter(str(directory)),
+                               trace_func=messages.append)
+
+    assert second_run.best_val_loss is None, "State should not be restored without a base snapshot"
+    assert any("checkpoint is missing" in msg for msg in messages), "The reason should be reported"
@@ -0,0 +1,88 @@
+# tests/test_lazy_imports.py
+
+import os
+import subprocess
+import sys
+import textwrap
+
+import numpy as np
+from early_stopping_pytorch import EarlyStopping, PickleEncoder, NumpyEncoder
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run_isolated(code):
+    '''Runs code in a fresh interpreter, where nothing has imported torch yet, and returns its stdout.'''
+    result = subprocess.run([sys.executable, '-c', textwrap.dedent(code)], cwd=ROOT, check=True,
+                            capture_output=True, text=True)
+    return result.stdout.strip()
+
+# Tests
+
+def test_import_does_not_load_torch_or_numpy():
+    """
+    Test that importing the package leaves torch and NumPy unimported.
+    """
+    output = run_isolated("""
+        import sys
+        import early_stopping_pytorch
+        print('torch' in sys.modules, 'numpy' in sys.modules)
+    """)
+
+    assert output == 'False False', "Importing the package should not import torch or NumPy"
+
+def test_replaying_a_loss_history_stays_torch_free(tmp_path):
+    """
+    Test that stopping decisions, resume state, criteria, the bank and pickle checkpoints work without torch
+    being imported, and that torch is loaded once a default torch.save checkpoint is written.
+    """
+    template = str(tmp_path / 'best_{metric}.pkl')
+    member_template = str(tmp_path / 'member_{member}.pkl')
+    output = run_isolated(f"""
+        import sys
+        from early_stopping_pytorch import (EarlyStopping, EarlyStoppingBank, MultiMetricEarlyStopping, PickleEncoder,
+                                            SlopeCriterion)
+
+        early_stopping = EarlyStopping(patience=2, trace_func=None, resume=True, criteria=[SlopeCriterion(3)],
+                                       path={str(tmp_path / 'checkpoint.pkl')!r}, encoder=PickleEncoder())
+        for val_loss in [1.0, 0.9, 0.95, 0.97]:
+            early_stopping(val_loss, {{'weights': [val_loss]}})
+        monitor = MultiMetricEarlyStopping({{'loss': {{}}, 'accuracy': {{'mode': 'max'}}}}, trace_func=None,
+                                           path={template!r}, encoder=PickleEncoder())
+        monitor({{'loss': 1.0, 'accuracy': 0.5}}, {{'weights': [1.0]}})
+        bank = EarlyStoppingBank(2, trace_func=None, path={member_template!r}, encoder=PickleEncoder())
+        bank([1.0, 0.5], [{{'weights': [1.0]}}, {{'weights': [0.5]}}])
+        print(early_stopping.early_stop, 'torch' in sys.modules)
+
+        EarlyStopping(path={str(tmp_path / 'checkpoint.pt')!r}, trace_func=None)(1.0, {{}})
+        print('torch' in sys.modules)
+    """)
+
+    assert output.splitlines() == ['True False', 'True'], "torch should only be imported by the torch.save checkpoint"
+    assert (tmp_path / 'member_1.pkl').exists(), "The bank should write its checkpoints through the encoder"
+
+def test_pickle_and_numpy_encoders_round_trip(tmp_path):
+    """
+    Test that the non-torch encoders restore the saved state.
+    """
+    state = {'dense.kernel': np.arange(6.0).reshape(2, 3), 'dense.bias': np.zeros(3)}
+    for encoder, name in [(PickleEncoder(), 'checkpoint.pkl'), (NumpyEncoder(), 'checkpoint.npz')]:
+        path = str(tmp_path / name)
+        early_stopping = EarlyStopping(path=path, encoder=encoder, trace_func=None)
+        early_stopping(1.0, state)
+
+        restored = encoder.load(path)
+        assert set(restored) == set(state), f"{name} should keep every key"
+        assert all(np.array_equal(restored[key], value) for key, value in state.items()), \
+            f"{name} should keep the values"
+
+def test_model_none_only_records_the_loss(tmp_path):
+    """
+    Test that without a model the decision logic runs and nothing is written.
+    """
+    early_stopping = EarlyStopping(patience=1, path=str(tmp_path / "checkpoint.pt"), trace_func=None)
+    early_stopping(1.0, None)
+    early_stopping(1.0, None)
+
+    assert early_stopping.early_stop and early_stopping.val_loss_min == 1.0, "The decision should still be made"
+    assert not os.path.exists(tmp_path / "checkpoint.pt"), "No checkpoint should be written without a model"
@@ -0,0 +1,112 @@
+# tests/test_multi_metric.py
+
+import os
+from unittest.mock import Mock
+
+import pytest
+import torch
+from early_stopping_pytorch import MultiMetricEarlyStopping, PickleEncoder
+
+# Fixtures
+
+@pytest.fixture
+def metrics():
+    return {
+        'val_loss': {'mode': 'min', 'patience': 2},
+        'accuracy': {'mode': 'max', 'delta': 0.01, 'patience': 3},
+    }
+
+# Tests
+
+def test_improving_metrics_share_one_serialization(model, metrics, tmp_path):
+    """
+    Test that when several metrics improve in the same epoch the model is serialized once and every
+    metric's best slot holds the same checkpoint.
+    """
+    save_func = Mock(wraps=torch.save)
+    monitor = MultiMetricEarlyStopping(metrics, path=str(tmp_path / "best_{metric}.pt"), save_func=save_func)
+
+    improved = monitor({'val_loss': 1.0, 'accuracy': 0.5}, model)
+
+    assert improved == ['val_loss', 'accuracy']
+    assert save_func.call_count == 1, "The model should be serialized once per call"
+    loss_path, accuracy_path = monitor.best_path('val_loss'), monitor.best_path('accuracy')
+    assert os.path.samefile(loss_path, accuracy_path) or \
+        open(loss_path, 'rb').read() == open(accuracy_path, 'rb').read()
+
+def test_slots_diverge_after_later_improvement(model, metrics, tmp_path):
+    """
+    Test that overwriting one metric's best checkpoint leaves the other metric's linked checkpoint intact.
+    """
+    monitor = MultiMetricEarlyStopping(metrics, path=str(tmp_path / "best_{metric}.pt"))
+    monitor({'val_loss': 1.0, 'accuracy': 0.5}, model)
+    original = {k: v.clone() for k, v in model.state_dict().items()}
+
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    improved = monitor({'val_loss': 0.5, 'accuracy': 0.505}, model)
+
+    assert improved == ['val_loss'], "An accuracy gain below delta is not an improvement"
+    restored = torch.nn.Linear(4, 2)
+    monitor.restore_best(restored, 'accuracy')
+    assert torch.equal(restored.weight, original['weight']), "The accuracy slot should keep the older weights"
+    monitor.restore_best(restored)
+    assert torch.equal(restored.weight, model.weight), "The primary slot should hold the newest weights"
+
+@pytest.mark.parametrize('stop_rule, expected_epoch', [('any', 3), ('all', 4), ('primary', 3)])
+def test_stop_rules(model, metrics, tmp_path, stop_rule, expected_epoch):
+    """
+    Test that 'any' stops with the first exhausted metric, 'all' with the last and 'primary' with the
+    primary one.
+    """
+    monitor = MultiMetricEarlyStopping(metrics, stop_rule=stop_rule, path=str(tmp_path / "best_{metric}.pt"),
+                                       trace_func=None)
+    for epoch in range(1, 6):
+        monitor({'val_loss': 1.0, 'accuracy': 0.5}, model)
+        if monitor.early_stop:
+            break
+
+    assert epoch == expected_epoch
+
+def test_missing_and_nan_metrics_are_skipped(model, metrics, tmp_path):
+    """
+    Test that metrics absent from the call or NaN keep their counter, and unknown names are rejected.
+    """
+    monitor = MultiMetricEarlyStopping(metrics, path=str(tmp_path / "best_{metric}.pt"), trace_func=None)
+    monitor({'val_loss': 1.0, 'accuracy': 0.5}, model)
+    monitor({'val_loss': float('nan')}, model)
+
+    assert monitor.metrics['val_loss'].counter == 0
+    assert monitor.metrics['accuracy'].counter == 0
+    with pytest.raises(ValueError):
+        monitor({'bleu': 1.0}, model)
+
+def test_state_dict_round_trip(model, metrics, tmp_path):
+    """
+    Test that the per-metric state can be saved and restored.
+    """
+    monitor = MultiMetricEarlyStopping(metrics, path=str(tmp_path / "best_{metric}.pt"), trace_func=None)
+    monitor({'val_loss': 1.0, 'accuracy': 0.5}, model)
+    monitor({'val_loss': 1.1, 'accuracy': 0.6}, model)
+
+    restored = MultiMetricEarlyStopping(metrics, path=str(tmp_path / "best_{metric}.pt"))
+    restored.load_state_dict(monitor.state_dict())
+
+    assert restored.state_dict() == monitor.state_dict()
+    assert restored.metrics['val_loss'].counter == 1 and restored.metrics['accuracy'].best == 0.6
+
+def test_restore_best_decodes_with_encoder(model, metrics, tmp_path):
+    """
+    Test that checkpoints written through an encoder are read back with the same encoder.
+    """
+    monitor = MultiMetricEarlyStopping(metrics, path=str(tmp_path / "best_{metric}.pt"), encoder=PickleEncoder(),
+                                       trace_func=None)
+    monitor({'val_loss': 1.0, 'accuracy': 0.5}, model)
+    best_weight = model.weight.detach().clone()
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    monitor.restore_best(model)
+
+    assert torch.equal(model.weight, best_weight), "The best weights should be restored through the encoder"
+    with pytest.raises(ValueError):
+        MultiMetricEarlyStopping(metrics, encoder=PickleEncoder(), save_func=torch.save)
@@ -0,0 +1,138 @@
+# tests/test_resume.py
+
+import threading
+from unittest.mock import patch
+
+import numpy as np
+from early_stopping_pytorch import EarlyStopping, CheckpointEncoder, EMASmoothing
+
+# Tests
+
+def test_state_dict_round_trip(model):
+    """
+    Test that load_state_dict() restores everything state_dict() captured.
+    """
+    with patch('early_stopping_pytorch.early_stopping.torch.save'):
+        early_stopping = EarlyStopping(patience=3, trace_func=lambda msg: None)
+        for loss in [1.0, 0.9, 0.95, 0.96]:
+            early_stopping(loss, model)
+
+    restored = EarlyStopping(patience=3)
+    restored.load_state_dict(early_stopping.state_dict())
+
+    assert restored.counter == 2, "Counter should be restored"
+    assert restored.best_val_loss == 0.9, "Best loss should be restored"
+    assert restored.val_loss_min == 0.9, "val_loss_min should be restored"
+    assert restored.epoch == 4, "Epoch should be restored"
+    assert restored.early_stop is False, "Early stop flag should be restored"
+
+def test_resume_continues_without_resaving(model, tmp_path):
+    """
+    Test that a restarted job with resume=True continues the patience count and does not rewrite the
+    checkpoint on its first call.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    first_run = EarlyStopping(patience=3, path=path, resume=True, trace_func=lambda msg: None)
+    for loss in [1.0, 0.9, 0.95]:
+        first_run(loss, model)
+
+    # Simulated preemption: a new process constructs EarlyStopping again
+    with patch('early_stopping_pytorch.early_stopping.torch.save') as mock_save:
+        second_run = EarlyStopping(patience=3, path=path, resume=True, trace_func=lambda msg: None)
+        assert second_run.counter == 1, "Counter should continue from the previous run"
+        second_run(0.97, model)
+        second_run(0.98, model)
+
+        assert mock_save.call_count == 0, "The checkpoint should not be rewritten after resuming"
+    assert second_run.early_stop is True, "Patience should not reset across restarts"
+
+def test_resume_ignores_state_without_checkpoint(model, tmp_path):
+    """
+    Test that saved state is ignored when the checkpoint it refers to no longer exists.
+    """
+    path = tmp_path / "checkpoint.pt"
+    first_run = EarlyStopping(patience=3, path=str(path), resume=True, trace_func=lambda msg: None)
+    first_run(1.0, model)
+    path.unlink()
+
+    messages = []
+    second_run = EarlyStopping(patience=3, path=str(path), resume=True, trace_func=messages.append)
+
+    assert second_run.best_val_loss is None, "State should not be restored without its checkpoint"
+    assert any("checkpoint is missing" in msg for msg in messages), "The reason should be reported"
+
+def test_resume_uses_last_finished_background_write(model, tmp_path):
+    """
+    Test that a job stopped while a newer best was still being written resumes from the best that is
+    actually on disk, not the newer loss recorded in memory.
+    """
+    class GatedEncoder(CheckpointEncoder):
+        def __init__(self, gate):
+            self.gate = gate
+
+        def save(self, checkpoint, path):
+            self.gate.wait()
+            super().save(checkpoint, path)
+
+    path = str(tmp_path / "checkpoint.pt")
+    open_gate, gate = threading.Event(), threading.Event()
+    open_gate.set()
+    first_run = EarlyStopping(path=path, resume=True, async_save=True, encoder=GatedEncoder(open_gate),
+                              trace_func=None)
+    first_run(1.0, model)
+    first_run.flush()
+
+    first_run.encoder.gate = gate
+    first_run(0.5, model)  # Still being written when the job is preempted
+    second_run = EarlyStopping(path=path, resume=True, trace_func=None)
+
+    assert second_run.epoch == 2, "The patience state should still be restored"
+    assert second_run.best_val_loss == 1.0, "The best loss should match the checkpoint on disk"
+    gate.set()
+    first_run.close()
+
+def test_resume_ignores_truncated_checkpoint(model, tmp_path):
+    """
+    Test that a checkpoint whose size differs from the one recorded in the state is not trusted.
+    """
+    path = tmp_path / "checkpoint.pt"
+    first_run = EarlyStopping(path=str(path), resume=True, trace_func=None)
+    first_run(1.0, model)
+    with open(path, 'r+b') as f:
+        f.truncate(16)
+
+    messages = []
+    second_run = EarlyStopping(path=str(path), resume=True, trace_func=messages.append)
+
+    assert second_run.best_val_loss is None, "State should not be restored with a partial checkpoint"
+    assert any("incomplete" in msg for msg in messages), "The reason should be reported"
+    assert not list(tmp_path.glob("*.tmp")), "Atomic writes should leave no temporary files"
+
+def test_resume_after_close_matches_last_background_write(model, tmp_path):
+    """
+    Test that close() records the last background write in the state, so a restart pairs the newest best
+    loss with the weights on disk.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    first_run = EarlyStopping(path=path, resume=True, async_save=True, trace_func=None)
+    for loss in [1.0, 0.9, 0.8]:
+        first_run(loss, model)
+    first_run.close()
+
+    second_run = EarlyStopping(path=path, resume=True, trace_func=None)
+
+    assert second_run.best_val_loss == 0.8, "The state should refer to the last checkpoint written"
+    assert second_run.state_dict()['checkpoint']['epoch'] == 3, "The checkpoint record should be up to date"
+
+def test_resume_with_numpy_scalar_loss(model, tmp_path):
+    """
+    Test that NumPy scalar losses are stored as plain floats, so the JSON state can be written.
+    """
+    path = str(tmp_path / "checkpoint.pt")
+    first_run = EarlyStopping(path=path, resume=True, smoothing=EMASmoothing(), trace_func=None)
+    first_run(np.mean(np.array([1.0, 0.5], dtype=np.float32)), model)
+
+    second_run = EarlyStopping(path=path, resume=True, smoothing=EMASmoothing(), trace_func=None)
+
+    assert second_run.best_val_loss == 0.75, "The best loss should be restored from the state file"
+    assert type(second_run.best_val_loss) is float, "The restored loss should be a plain float"
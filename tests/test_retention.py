@@ -0,0 +1,112 @@
+# tests/test_retention.py
+
+import json
+import os
+from unittest.mock import Mock
+
+import pytest
+import torch
+from early_stopping_pytorch import EarlyStopping, CheckpointRetention
+
+# Tests
+
+def test_keeps_k_best_and_evicts_worst(model, tmp_path):
+    """
+    Test that only the k best checkpoints remain on disk and in the index, named by epoch and score.
+    """
+    retention = CheckpointRetention(str(tmp_path), k=2)
+    for epoch, score in enumerate([0.9, 0.5, 0.7, 0.6], start=1):
+        retention.save(model.state_dict(), score, epoch)
+
+    kept = sorted(p.name for p in tmp_path.glob("*.pt"))
+    assert kept == ["checkpoint_epoch2_0.500000.pt", "checkpoint_epoch4_0.600000.pt"], "The two best should be kept"
+    with open(tmp_path / "index.json") as f:
+        index = json.load(f)
+    assert [e['score'] for e in index['checkpoints']] == [0.5, 0.6], "Index should list the kept checkpoints"
+    assert retention.best['epoch'] == 2, "Best entry should be epoch 2"
+
+def test_skips_serialization_when_candidate_cannot_enter(model, tmp_path):
+    """
+    Test that a candidate worse than every kept checkpoint is never serialized once the top k is full.
+    """
+    mock_save = Mock(wraps=torch.save)
+    retention = CheckpointRetention(str(tmp_path), k=1, save_func=mock_save)
+
+    retention.save(model.state_dict(), 0.5, 1)
+    assert retention.save(model.state_dict(), 0.8, 2) is None, "A worse candidate should be rejected"
+    assert mock_save.call_count == 1, "The rejected candidate should not be serialized"
+
+def test_byte_budget_and_index_reload(model, tmp_path):
+    """
+    Test that the byte budget evicts checkpoints and that a new manager picks up the index without a scan.
+    """
+    retention = CheckpointRetention(str(tmp_path), k=10)
+    retention.save(model.state_dict(), 0.5, 1)
+    size = retention.total_bytes
+
+    budgeted = CheckpointRetention(str(tmp_path), k=10, max_bytes=2 * size)
+    assert len(budgeted.entries) == 1, "The existing index should be loaded"
+    budgeted.save(model.state_dict(), 0.4, 2)
+    budgeted.save(model.state_dict(), 0.3, 3)
+
+    assert len(budgeted.entries) == 2, "Only two checkpoints fit in the byte budget"
+    assert budgeted.total_bytes <= 2 * size, "Kept checkpoints should stay within the budget"
+    assert not os.path.exists(tmp_path / "checkpoint_epoch1_0.500000.pt"), "The worst checkpoint should be evicted"
+
+def test_failed_write_keeps_current_best(model, tmp_path):
+    """
+    Test that a crash while writing leaves neither a partial file nor a broken index behind.
+    """
+    def failing_save(obj, path):
+        with open(path, 'wb') as f:
+            f.write(b'partial')
+        raise OSError("disk full")
+
+    retention = CheckpointRetention(str(tmp_path), k=2)
+    retention.save(model.state_dict(), 0.5, 1)
+    retention.save_func = failing_save
+    with pytest.raises(OSError):
+        retention.save(model.state_dict(), 0.4, 2)
+
+    assert sorted(p.name for p in tmp_path.iterdir()) == ["checkpoint_epoch1_0.500000.pt", "index.json"], \
+        "No temporary or partial files should remain"
+    assert torch.load(retention.best['path'])['weight'].shape == (2, 4), "The current best should still load"
+
+def test_early_stopping_saves_top_k(model, tmp_path):
+    """
+    Test that EarlyStopping with retention also keeps epochs that are not a new best but enter the top k,
+    and that restore_best() loads the best kept checkpoint.
+    """
+    retention = CheckpointRetention(str(tmp_path), k=2)
+    early_stopping = EarlyStopping(patience=5, retention=retention, trace_func=lambda msg: None)
+    for loss in [1.0, 0.5, 0.7, 0.9]:
+        early_stopping(loss, model)
+
+    assert [e['epoch'] for e in retention.entries] == [2, 3], "Epochs 2 and 3 are the two best"
+    assert early_stopping.checkpoint_path == retention.best['path'], "The best kept checkpoint is the current best"
+    early_stopping.restore_best(model)
+
+def test_in_memory_writes_best_through_retention_on_stop(model, tmp_path):
+    """
+    Test that in_memory mode writes nothing until the stop, and then writes the best epoch under its own
+    name and score in the index.
+    """
+    retention = CheckpointRetention(str(tmp_path), k=3)
+    early_stopping = EarlyStopping(patience=1, retention=retention, in_memory=True, save_on_stop=True,
+                                   trace_func=None)
+    best_weight = model.weight.detach().clone()
+    early_stopping(1.0, model)
+    with torch.no_grad():
+        model.weight.add_(1.0)
+    early_stopping(2.0, model)
+
+    assert [(e['epoch'], e['score']) for e in retention.entries] == [(1, 1.0)]
+    assert [p.name for p in tmp_path.glob("*.pt")] == ["checkpoint_epoch1_1.000000.pt"]
+    assert torch.equal(torch.load(retention.best['path'])['weight'], best_weight)
+
+def test_retention_rejects_async_save(tmp_path):
+    """
+    Test that retention is not silently written synchronously when async_save is requested.
+    """
+    with pytest.raises(ValueError):
+        EarlyStopping(retention=CheckpointRetention(str(tmp_path)), async_save=True)
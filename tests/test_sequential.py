@@ -0,0 +1,100 @@
+# tests/test_sequential.py
+
+import math
+import random
+import statistics
+
+import pytest
+from early_stopping_pytorch import EarlyStopping, SequentialValidation
+
+# Fixtures
+
+def batch_losses(mean, n=200, std=0.1, seed=0):
+    rng = random.Random(seed)
+    return [rng.gauss(mean, std) for _ in range(n)]
+
+# Tests
+
+def test_running_mean_and_variance_match_full_pass():
+    """
+    Test that the running statistics equal those computed over all losses at once.
+    """
+    losses = batch_losses(1.0, n=50)
+    validation = SequentialValidation(threshold=None)
+    for loss in losses:
+        assert not validation.update(loss), "Without a threshold the pass should never end early"
+
+    assert validation.mean == pytest.approx(statistics.mean(losses))
+    assert validation.variance == pytest.approx(statistics.variance(losses))
+
+def test_clearly_worse_pass_stops_early_and_counts_towards_patience(model, tmp_path):
+    """
+    Test that a pass far above the best loss ends after few batches and increments the counter.
+    """
+    events = []
+    early_stopping = EarlyStopping(patience=1, path=str(tmp_path / "checkpoint.pt"), callbacks=[events.append])
+    early_stopping(1.0, model)
+
+    validation = early_stopping.sequential_validation(min_batches=10, total_batches=200)
+    batches = 0
+    for loss in batch_losses(1.5):
+        batches += 1
+        if validation.update(loss):
+            break
+    early_stopping(validation, model)
+
+    assert batches < 20, "A clearly worse pass should end soon after min_batches"
+    assert validation.decision == 'worse'
+    assert early_stopping.counter == 1 and early_stopping.early_stop
+    assert early_stopping.best_val_loss == 1.0, "An estimated worse pass must not change the best loss"
+    assert any(e.name == 'validation_stopped_early' and e.data['batches'] == batches for e in events)
+
+def test_close_pass_runs_to_the_end(model, tmp_path):
+    """
+    Test that a pass slightly better than the best, within the noise of a few batches, is not cut short.
+    """
+    early_stopping = EarlyStopping(patience=3, path=str(tmp_path / "checkpoint.pt"))
+    early_stopping(1.0, model)
+
+    validation = early_stopping.sequential_validation(min_batches=10, total_batches=200)
+    losses = batch_losses(0.98, seed=1)
+    decided = [validation.update(loss) for loss in losses]
+
+    assert not any(decided), "Outcome is not clear, so every batch should be evaluated"
+    assert validation.batches == len(losses)
+    assert validation.mean == pytest.approx(statistics.mean(losses))
+
+def test_better_pass_only_stops_early_when_enabled(model, tmp_path):
+    """
+    Test that early_exit='both' ends a clearly better pass and records its estimate as the new best,
+    while the default keeps evaluating.
+    """
+    early_stopping = EarlyStopping(patience=3, path=str(tmp_path / "checkpoint.pt"))
+    early_stopping(1.0, model)
+
+    default = early_stopping.sequential_validation(min_batches=10)
+    both = early_stopping.sequential_validation(min_batches=10, early_exit='both')
+    losses = batch_losses(0.5)
+    assert not any(default.update(loss) for loss in losses)
+    for loss in losses:
+        if both.update(loss):
+            break
+    early_stopping(both, model)
+
+    assert both.decision == 'better' and both.batches < len(losses)
+    assert early_stopping.best_val_loss == both.mean and early_stopping.counter == 0
+
+def test_nan_batch_makes_epoch_nan(model, tmp_path):
+    """
+    Test that a NaN batch loss prevents an early decision and the epoch is skipped like a NaN loss.
+    """
+    early_stopping = EarlyStopping(patience=3, path=str(tmp_path / "checkpoint.pt"))
+    early_stopping(1.0, model)
+
+    validation = early_stopping.sequential_validation(min_batches=2)
+    validation.update(float('nan'))
+    assert not any(validation.update(loss) for loss in batch_losses(5.0, n=20))
+    early_stopping(validation, model)
+
+    assert math.isnan(validation.mean)
+    assert early_stopping.counter == 0, "A NaN epoch should be ignored"